@@ -1,16 +1,217 @@
+import argparse
+import importlib
 import sys
-import subprocess
 from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
 
-def run_script(script_name: str) -> None:
-    script_path = Path("scripts") / script_name
-    print(f"\n--- Running {script_name} ---")
-    result = subprocess.run([sys.executable, str(script_path)])
-    if result.returncode != 0:
-        print(f"Error running {script_name}")
-        sys.exit(result.returncode)
+SCRIPTS_DIR = Path(__file__).parent / "scripts"
 
-def main() -> None:
+# Defaults mirror the module constants in scripts/
+RAW_DIR = Path("rawdata")
+DATA_DIR = Path("docs/data")
+EXCLUDED_PARTIES = ["6", "9", "11"]
+MAX_NUMBER = 15
+QUEUE_SIZE = 32
+
+def load_script(name: str) -> ModuleType:
+    """
+    Imports scripts/<name>.py on first use, so --help and unrelated commands never pay
+    for requests, the process pool or the analysis modules.
+    """
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    return importlib.import_module(name)
+
+def configure(module: ModuleType, **constants) -> ModuleType:
+    # Scripts read their configuration from module constants at call time
+    for name, value in constants.items():
+        if not hasattr(module, name):
+            raise AttributeError(f"{module.__name__} has no setting {name}")
+        setattr(module, name, value)
+    return module
+
+def mp_dir(args: argparse.Namespace) -> Path:
+    return args.mp_dir or args.raw_dir / "mp"
+
+def pl_dir(args: argparse.Namespace) -> Path:
+    return args.pl_dir or args.raw_dir / "pl"
+
+def configure_scraper(args: argparse.Namespace) -> ModuleType:
+    scraper = configure(load_script("election_scraper"), MP_DIR=mp_dir(args), PL_DIR=pl_dir(args))
+    if args.snapshot:
+        scraper.TIMESTAMP_VERSION = args.snapshot
+    return scraper
+
+# Commands return True on success; main() turns a False into exit status 1
+def cmd_scrape(args: argparse.Namespace) -> bool:
+    print("\n--- Scraping election results ---")
+    return configure_scraper(args).main()
+
+def configure_report(args: argparse.Namespace) -> ModuleType:
+    return configure(
+        load_script("generate_anomaly_report"),
+        MP_DIR=mp_dir(args),
+        PL_DIR=pl_dir(args),
+        COMMON_DATA_FILE=args.data_dir / "common-data.json",
+        OUTPUT_ANOMALY_FILE=args.data_dir / "anomaly_report.json",
+        OUTPUT_PROVINCE_FILE=args.data_dir / "province_stats.json",
+        OUTPUT_MP_PARTY_FILE=args.data_dir / "mp_party_stats.json",
+        OUTPUT_COMPARISON_FILE=args.data_dir / "party_comparison_stats.json",
+        TARGET_NUMBER_RANGE=[str(i) for i in range(1, args.max_number + 1)],
+        EXCLUDED_PARTIES=args.exclude,
+    )
+
+def configure_nationwide(args: argparse.Namespace) -> ModuleType:
+    return configure(
+        load_script("calculate_nationwide_votes"),
+        MP_DIR=mp_dir(args),
+        PL_DIR=pl_dir(args),
+        OUTPUT_FILE=args.data_dir / "nationwide_party_stats.json",
+    )
+
+def cmd_analyze(args: argparse.Namespace) -> bool:
+    print("\n--- Analyzing anomalies ---")
+    return configure_report(args).main(workers=args.workers, streaming=args.stream)
+
+def cmd_nationwide(args: argparse.Namespace) -> bool:
+    print("\n--- Calculating nationwide votes ---")
+    nationwide = configure_nationwide(args)
+    return nationwide.calculate_nationwide_votes(workers=args.workers, streaming=args.stream)
+
+def cmd_compare(args: argparse.Namespace) -> bool:
+    print("\n--- Comparing MP winning numbers with party-list results ---")
+    comparer = configure(
+        load_script("mp_pl_comparer"),
+        MP_DIR=mp_dir(args),
+        PL_DIR=pl_dir(args),
+        EXCLUDED_PARTIES=args.exclude,
+    )
+    return comparer.compare_mp_and_pl()
+
+def cmd_verify(args: argparse.Namespace) -> bool:
+    print("\n--- Verifying hypotheses ---")
+    verify = configure(
+        load_script("verify_hypothesis"),
+        MP_DIR=mp_dir(args),
+        PL_DIR=pl_dir(args),
+        EXCLUDED_PARTIES=args.exclude,
+    )
+    return verify.analyze(workers=args.workers, streaming=args.stream)
+
+def cmd_stream(args: argparse.Namespace) -> bool:
+    print("\n--- Streaming scrape -> analysis ---")
+    configure_report(args)
+    configure_nationwide(args)
+    if not args.replay:
+        configure_scraper(args)
+    pipeline = load_script("stream_pipeline")
+    return pipeline.main(replay=args.replay, streaming=args.stream, queue_size=args.queue_size)
+
+def cmd_publish(args: argparse.Namespace) -> bool:
+    print("\n--- Packing site for deployment ---")
+    load_script("pack_for_deployment").pack_site()  # Raises on failure
+    return True
+
+def cmd_all(args: argparse.Namespace) -> bool:
+    # publish packs docs/ as is, so reports written anywhere else would never reach the site
+    if args.data_dir.resolve() != DATA_DIR.resolve():
+        print(f"Error: 'all' publishes {DATA_DIR}, but --data-dir is {args.data_dir}. "
+              "Run analyze and nationwide on their own to write reports elsewhere.")
+        return False
+    # Stops at the first failed step so a broken analysis is never published
+    steps = [cmd_analyze, cmd_nationwide, cmd_publish]
+    if not args.skip_scrape:
+        steps.insert(0, cmd_scrape)
+    for step in steps:
+        if not step(args):
+            print(f"\nError: {step.__name__[len('cmd_'):]} failed, pipeline stopped.")
+            return False
+    return True
+
+COMMANDS: Dict[str, Callable[[argparse.Namespace], bool]] = {
+    "scrape": cmd_scrape,
+    "analyze": cmd_analyze,
+    "nationwide": cmd_nationwide,
+    "compare": cmd_compare,
+    "verify": cmd_verify,
+    "stream": cmd_stream,
+    "publish": cmd_publish,
+    "all": cmd_all,
+}
+
+def party_list(value: str) -> List[str]:
+    # "06,9, 11" -> ["6", "9", "11"], matching how the scripts normalize party numbers
+    try:
+        return [str(int(v)) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated party numbers, got {value!r}")
+
+def build_parser() -> argparse.ArgumentParser:
+    raw_paths = argparse.ArgumentParser(add_help=False)
+    raw_paths.add_argument("--raw-dir", type=Path, default=RAW_DIR,
+                           help="Scraped data directory holding mp/ and pl/ (default: %(default)s)")
+    raw_paths.add_argument("--mp-dir", type=Path,
+                           help="MP results directory (default: <raw-dir>/mp)")
+    raw_paths.add_argument("--pl-dir", type=Path,
+                           help="Party-list results directory (default: <raw-dir>/pl)")
+
+    paths = argparse.ArgumentParser(add_help=False, parents=[raw_paths])
+    paths.add_argument("--data-dir", type=Path, default=DATA_DIR,
+                       help="Directory for the JSON reports (default: %(default)s)")
+
+    run = argparse.ArgumentParser(add_help=False)
+    run.add_argument("--workers", type=int, default=1,
+                     help="Process pool size for the per-province map-reduce (1 = serial)")
+    run.add_argument("--stream", action="store_true",
+                     help="Parse area files incrementally, keeping only the fields analyses need")
+
+    exclude = argparse.ArgumentParser(add_help=False)
+    exclude.add_argument("--exclude", type=party_list, default=EXCLUDED_PARTIES,
+                         help="Comma-separated party numbers to ignore (default: %s)"
+                              % ",".join(EXCLUDED_PARTIES))
+
+    analyze = argparse.ArgumentParser(add_help=False)
+    analyze.add_argument("--max-number", type=int, default=MAX_NUMBER,
+                         help="Highest winning ballot number checked for twin anomalies "
+                              "(default: %(default)s)")
+
+    scrape = argparse.ArgumentParser(add_help=False)
+    scrape.add_argument("--snapshot",
+                        help="Result snapshot to fetch, e.g. 2026-02-09-19-58-02-921 "
+                             "(default: TIMESTAMP_VERSION)")
+
+    parser = argparse.ArgumentParser(
+        description="Election 69 Analyzer CLI. Run without a command for the interactive menu."
+    )
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    sub.add_parser("scrape", parents=[raw_paths, scrape],
+                   help="Download MP and party-list results")
+    sub.add_parser("analyze", parents=[paths, run, exclude, analyze],
+                   help="Generate the twin-number anomaly reports")
+    sub.add_parser("nationwide", parents=[paths, run],
+                   help="Calculate nationwide party votes")
+    sub.add_parser("compare", parents=[raw_paths, exclude],
+                   help="Compare MP winning numbers with party-list results (legacy)")
+    sub.add_parser("verify", parents=[raw_paths, run, exclude],
+                   help="Print the hypothesis verification summary")
+    live = sub.add_parser("stream", parents=[paths, exclude, analyze, scrape],
+                          help="Scrape and analyze together, writing partial reports per province")
+    live.add_argument("--replay", action="store_true",
+                      help="Feed the files already in --raw-dir instead of downloading")
+    live.add_argument("--stream", action="store_true",
+                      help="Parse replayed area files incrementally, keeping only the fields "
+                           "analyses need")
+    live.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                      help="Areas buffered between download and analysis (default: %(default)s)")
+    sub.add_parser("publish", help="Pack docs/ into the content-hashed dist/ build")
+    pipeline = sub.add_parser("all", parents=[paths, run, exclude, analyze, scrape],
+                              help="Run scrape -> analyze -> nationwide -> publish")
+    pipeline.add_argument("--skip-scrape", action="store_true",
+                          help="Reuse the data already in --raw-dir")
+    return parser
+
+def interactive_menu(parser: argparse.ArgumentParser) -> bool:
     print("Election 69 Analyzer CLI")
     print("=" * 30)
     print("1. Scrape Data (election_scraper.py)")
@@ -19,24 +220,31 @@ def main() -> None:
     print("4. Compare MP/PL (mp_pl_comparer.py) - Legacy")
     print("5. Run Full Analysis Pipeline (2 -> 3)")
     print("q. Quit")
-    
+
     choice = input("\nSelect an option: ").strip().lower()
-    
-    if choice == "1":
-        run_script("election_scraper.py")
-    elif choice == "2":
-        run_script("generate_anomaly_report.py")
-    elif choice == "3":
-        run_script("calculate_nationwide_votes.py")
-    elif choice == "4":
-        run_script("mp_pl_comparer.py")
-    elif choice == "5":
-        run_script("generate_anomaly_report.py")
-        run_script("calculate_nationwide_votes.py")
-    elif choice == "q":
+    choices = {
+        "1": ["scrape"],
+        "2": ["analyze"],
+        "3": ["nationwide"],
+        "4": ["compare"],
+        "5": ["analyze", "nationwide"],
+    }
+    if choice == "q":
         print("Exiting.")
-    else:
+        return True
+    if choice not in choices:
         print("Invalid choice")
+        return False
+    return all(COMMANDS[command](parser.parse_args([command])) for command in choices[choice])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        ok = interactive_menu(parser)
+    else:
+        ok = COMMANDS[args.command](args)
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import json
+import math
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configuration
+GEOJSON_FILE = Path("rawdata/geojson/provinces.geojson")
+COMMON_DATA_FILE = Path("docs/data/common-data.json")
+OUTPUT_DIR = Path("docs/data/geo")
+# Leaflet zoom levels to precompute; tolerance is one screen pixel at that zoom
+ZOOM_LEVELS = [5, 7, 9]
+
+Point = Tuple[float, float]
+Ring = List[Point]
+
+def zoom_tolerance(zoom: int) -> float:
+    # Degrees of longitude covered by one 256px-tile pixel at this zoom
+    return 360 / (256 * 2 ** zoom)
+
+def zoom_precision(zoom: int) -> int:
+    # Decimal places whose rounding error stays under half the simplification tolerance
+    return max(0, math.ceil(-math.log10(zoom_tolerance(zoom) / 2)))
+
+def point_segment_distance(p: Point, a: Point, b: Point) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    if dx == 0 and dy == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(p[0] - (a[0] + t * dx), p[1] - (a[1] + t * dy))
+
+def simplify_line(points: Ring, tolerance: float) -> Ring:
+    """
+    Douglas-Peucker simplification (iterative, so long rings do not hit the recursion limit).
+    """
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        max_dist, index = 0.0, -1
+        for i in range(start + 1, end):
+            dist = point_segment_distance(points[i], points[start], points[end])
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index != -1 and max_dist > tolerance:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return [p for p, k in zip(points, keep) if k]
+
+def quantize_ring(ring: Ring, precision: int) -> Ring:
+    """
+    Rounds coordinates to the zoom level's grid and drops points that collapse together.
+    """
+    out: Ring = []
+    for lon, lat in ring:
+        q = (round(lon, precision), round(lat, precision))
+        if not out or q != out[-1]:
+            out.append(q)
+    return out
+
+def simplify_polygons(polygons: List[List[Ring]], zoom: int) -> List[List[Ring]]:
+    """
+    Simplifies and quantizes MultiPolygon coordinates for one zoom level. Rings with fewer
+    than 4 points left are dropped (a dropped outer ring drops its holes too). If every
+    polygon disappears, the largest one is kept with quantization only.
+    """
+    tolerance, precision = zoom_tolerance(zoom), zoom_precision(zoom)
+    result = []
+    for polygon in polygons:
+        rings = [quantize_ring(simplify_line(ring, tolerance), precision) for ring in polygon]
+        if len(rings[0]) < 4:
+            continue
+        result.append([rings[0]] + [r for r in rings[1:] if len(r) >= 4])
+    if not result and polygons:
+        largest = max(polygons, key=lambda poly: abs(ring_area(poly[0])))
+        result.append([quantize_ring(largest[0], precision)])
+    return result
+
+def ring_area(ring: Ring) -> float:
+    # Shoelace formula, signed, in squared degrees
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:])) / 2
+
+def ring_centroid(ring: Ring) -> Point:
+    area = ring_area(ring)
+    if area == 0:
+        return ring[0]
+    cx = sum((x1 + x2) * (x1 * y2 - x2 * y1) for (x1, y1), (x2, y2) in zip(ring, ring[1:]))
+    cy = sum((y1 + y2) * (x1 * y2 - x2 * y1) for (x1, y1), (x2, y2) in zip(ring, ring[1:]))
+    return cx / (6 * area), cy / (6 * area)
+
+def polygons_centroid(polygons: List[List[Ring]]) -> Point:
+    """
+    Area-weighted centroid of a MultiPolygon (holes subtract), from full-resolution rings.
+    """
+    total, sx, sy = 0.0, 0.0, 0.0
+    for polygon in polygons:
+        for i, ring in enumerate(polygon):
+            area = abs(ring_area(ring)) * (1 if i == 0 else -1)
+            cx, cy = ring_centroid(ring)
+            total += area
+            sx += cx * area
+            sy += cy * area
+    if total == 0:
+        return polygons[0][0][0]
+    return sx / total, sy / total
+
+def polygons_bbox(polygons: List[List[Ring]]) -> List[float]:
+    lons = [p[0] for polygon in polygons for p in polygon[0]]
+    lats = [p[1] for polygon in polygons for p in polygon[0]]
+    return [min(lons), min(lats), max(lons), max(lats)]
+
+def province_code(properties: Dict[str, Any]) -> Optional[str]:
+    # Boundary files use "pro_code": "10"; also accept "PROVINCE-10"-style codes
+    code = properties.get("pro_code") or properties.get("code")
+    return str(code).replace("PROVINCE-", "") if code else None
+
+def load_provinces() -> Dict[str, Dict[str, str]]:
+    with open(COMMON_DATA_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        p["code"].replace("PROVINCE-", ""): {"name": p["name"], "region": p.get("regionCode", "")}
+        for p in data.get("provinces", [])
+    }
+
+def load_geometries(path: Path) -> Dict[str, List[List[Ring]]]:
+    """
+    Returns province code -> MultiPolygon coordinates (Polygons are wrapped as one-item lists).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    geometries: Dict[str, List[List[Ring]]] = {}
+    for feature in data.get("features", []):
+        code = province_code(feature.get("properties") or {})
+        geometry = feature.get("geometry") or {}
+        if not code:
+            print(f"Warning: Feature without province code skipped: {feature.get('properties')}")
+            continue
+        coords = geometry.get("coordinates", [])
+        polygons = [coords] if geometry.get("type") == "Polygon" else coords
+        rings = [[[(p[0], p[1]) for p in ring] for ring in polygon] for polygon in polygons]
+        geometries.setdefault(code, []).extend(rings)
+    return geometries
+
+def write_json(path: Path, data: Any) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    path.write_text(text, encoding="utf-8")
+    return len(text.encode("utf-8"))
+
+def main() -> bool:
+    for path in (GEOJSON_FILE, COMMON_DATA_FILE):
+        if not path.exists():
+            print(f"Error: {path} not found.")
+            return False
+
+    provinces = load_provinces()
+    geometries = load_geometries(GEOJSON_FILE)
+
+    missing = sorted(set(provinces) - set(geometries))
+    if missing:
+        print(f"Warning: No boundary for provinces {missing}")
+
+    if OUTPUT_DIR.exists():
+        shutil.rmtree(OUTPUT_DIR)
+
+    index = {
+        "source": GEOJSON_FILE.name,
+        "zoom_levels": {
+            str(z): {"tolerance": round(zoom_tolerance(z), 6), "precision": zoom_precision(z)}
+            for z in ZOOM_LEVELS
+        },
+        "provinces": {},
+    }
+    for code in sorted(geometries):
+        if code not in provinces:
+            print(f"Warning: Province {code} is not in {COMMON_DATA_FILE.name}, skipped")
+            continue
+        lon, lat = polygons_centroid(geometries[code])
+        index["provinces"][code] = {
+            **provinces[code],
+            "centroid": [round(lon, 4), round(lat, 4)],
+            "bbox": [round(v, 4) for v in polygons_bbox(geometries[code])],
+        }
+
+    for zoom in ZOOM_LEVELS:
+        features = []
+        shard_bytes = 0
+        for code, info in index["provinces"].items():
+            feature = {
+                "type": "Feature",
+                "properties": {"code": code, "name": info["name"]},
+                "geometry": {
+                    "type": "MultiPolygon",
+                    "coordinates": simplify_polygons(geometries[code], zoom),
+                },
+            }
+            features.append(feature)
+            shard_bytes += write_json(OUTPUT_DIR / f"z{zoom}" / f"{code}.json", feature)
+        total = write_json(
+            OUTPUT_DIR / f"z{zoom}" / "thailand.json",
+            {"type": "FeatureCollection", "features": features},
+        )
+        points = sum(
+            len(ring) for f in features for poly in f["geometry"]["coordinates"] for ring in poly
+        )
+        print(f"Zoom {zoom}: {points:,} points, {total:,} bytes nationwide, "
+              f"{shard_bytes:,} bytes in {len(features)} province shards")
+
+    write_json(OUTPUT_DIR / "index.json", index)
+    print(f"Saved: {OUTPUT_DIR}/")
+    return True
+
+if __name__ == "__main__":
+    ok = main()
+    sys.exit(0 if ok else 1)
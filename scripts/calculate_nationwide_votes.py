@@ -1,51 +1,77 @@
-import json
+import argparse
+import sys
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
-def calculate_nationwide_votes():
-    # Path to Data
-    base_dir = Path("rawdata")
-    pl_dir = base_dir / "pl"
-    mp_dir = base_dir / "mp"
-    
-    pl_files = list(pl_dir.glob("*.json"))
-    mp_files = list(mp_dir.glob("*.json"))
+from election_data import load_area_entries, map_shards, shard_by_province, write_json
+
+# Configuration
+MP_DIR = Path("rawdata/mp")
+PL_DIR = Path("rawdata/pl")
+OUTPUT_FILE = Path("docs/data/nationwide_party_stats.json")
+
+def add_party_votes(party_votes: Dict[str, int], entries: List[Dict[str, Any]]) -> None:
+    # Adds one area's voteTotal per partyCode to the running totals
+    for entry in entries:
+        party_code = entry.get("partyCode")
+        vote = int(entry.get("voteTotal", 0))
+        if party_code:
+            party_votes[party_code] = party_votes.get(party_code, 0) + vote
+
+def sum_party_votes(files: List[Path], label: str, streaming: bool = False) -> Dict[str, int]:
+    """
+    Sums voteTotal per partyCode over one shard of area files.
+    """
+    party_votes: Dict[str, int] = {}  # party_code -> total votes
+    for file_path in files:
+        try:
+            add_party_votes(party_votes, load_area_entries(file_path, streaming))
+        except Exception as e:
+            print(f"Error processing {label} {file_path}: {e}")
+    return party_votes
+
+def merge_party_votes(partials: List[Dict[str, int]]) -> Dict[str, int]:
+    merged: Dict[str, int] = {}
+    for party_votes in partials:
+        for party_code, vote in party_votes.items():
+            merged[party_code] = merged.get(party_code, 0) + vote
+    return merged
+
+def calculate_nationwide_votes(workers: int = 1, streaming: bool = False) -> bool:
+    pl_files = list(PL_DIR.glob("*.json"))
+    mp_files = list(MP_DIR.glob("*.json"))
     
     if not pl_files:
-        print("No data found in rawdata/pl/")
-        return
+        print(f"No data found in {PL_DIR}/")
+        return False
 
-    pl_party_votes: Dict[str, int] = {}  # party_code -> total_pl_votes
-    mp_party_votes: Dict[str, int] = {}  # party_code -> total_mp_votes
-    
+    # Map over province shards (process pool when workers > 1), reduce by summing per party
     # 1. Calculate PL Votes
     print(f"Processing PL data from {len(pl_files)} files...")
-    for file_path in pl_files:
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            for entry in data.get("entries", []):
-                party_code = entry.get("partyCode")
-                vote = int(entry.get("voteTotal", 0))
-                if party_code:
-                    pl_party_votes[party_code] = pl_party_votes.get(party_code, 0) + vote
-        except Exception as e:
-            print(f"Error processing PL {file_path}: {e}")
+    pl_func = partial(sum_party_votes, label="PL", streaming=streaming)
+    pl_partials = map_shards(pl_func, shard_by_province(pl_files), workers)
+    pl_party_votes = merge_party_votes(pl_partials)  # party_code -> total_pl_votes
 
     # 2. Calculate MP Votes
     print(f"Processing MP data from {len(mp_files)} files...")
-    for file_path in mp_files:
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            for entry in data.get("entries", []):
-                party_code = entry.get("partyCode")
-                vote = int(entry.get("voteTotal", 0))
-                if party_code:
-                    mp_party_votes[party_code] = mp_party_votes.get(party_code, 0) + vote
-        except Exception as e:
-            print(f"Error processing MP {file_path}: {e}")
+    mp_func = partial(sum_party_votes, label="MP", streaming=streaming)
+    mp_partials = map_shards(mp_func, shard_by_province(mp_files), workers)
+    mp_party_votes = merge_party_votes(mp_partials)  # party_code -> total_mp_votes
+
+    output_data = summarize_party_votes(pl_party_votes, mp_party_votes)
+    write_json(OUTPUT_FILE, output_data, indent=2)
+    
+    print(f"\nDetailed stats saved to {OUTPUT_FILE}")
+    return True
 
+def summarize_party_votes(
+    pl_party_votes: Dict[str, int], mp_party_votes: Dict[str, int], verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Groups the nationwide per-party totals (A: 1-15 excl 6,9,11; B: 6,9,11; C: 16+) and
+    returns the nationwide_party_stats.json structure. verbose prints each group.
+    """
     # Process results into groups
     group_a_stats = {"pl_votes": 0, "mp_votes": 0, "count": 0, "parties": []} # Lucky Number Candidate (1-15, excl 6,9,11)
     group_b_stats = {"pl_votes": 0, "mp_votes": 0, "count": 0, "parties": []} # Excluded (6, 9, 11)
@@ -101,20 +127,21 @@ def calculate_nationwide_votes():
     raw_list.sort(key=lambda x: x["party_number"])
 
     # Output Results
-    print("\n--- Nationwide Party Vote Analysis (MP vs PL) ---")
+    if verbose:
+        print("\n--- Nationwide Party Vote Analysis (MP vs PL) ---")
     
     def print_group(name, stats):
-        print(f"\n{name}:")
-        print(f"  Parties Included: {sorted(stats['parties'])}")
-        print(f"  Total Parties: {stats['count']}")
-        print(f"  Total PL Votes: {stats['pl_votes']:,}")
-        print(f"  Total MP Votes: {stats['mp_votes']:,}")
-        
         avg_pl = stats['pl_votes'] / stats['count'] if stats['count'] > 0 else 0
         ratio = stats['pl_votes'] / stats['mp_votes'] if stats['mp_votes'] > 0 else 0
-        
-        print(f"  Average PL Votes/Party: {avg_pl:,.2f}")
-        print(f"  Group Ratio (PL/MP): {ratio:.2f}x")
+
+        if verbose:
+            print(f"\n{name}:")
+            print(f"  Parties Included: {sorted(stats['parties'])}")
+            print(f"  Total Parties: {stats['count']}")
+            print(f"  Total PL Votes: {stats['pl_votes']:,}")
+            print(f"  Total MP Votes: {stats['mp_votes']:,}")
+            print(f"  Average PL Votes/Party: {avg_pl:,.2f}")
+            print(f"  Group Ratio (PL/MP): {ratio:.2f}x")
         
         return {
             "pl_total": stats["pl_votes"],
@@ -129,7 +156,7 @@ def calculate_nationwide_votes():
     res_c = print_group("Group C: Other Parties (16+)", group_c_stats)
 
     # Creating a JSON output file for the user to use
-    output_data = {
+    return {
         "groups": {
             "A": res_a,
             "B": res_b,
@@ -137,12 +164,14 @@ def calculate_nationwide_votes():
         },
         "raw_parties": raw_list
     }
-    
-    output_file = "docs/data/nationwide_party_stats.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2)
-    
-    print(f"\nDetailed stats saved to {output_file}")
 
 if __name__ == "__main__":
-    calculate_nationwide_votes()
+    parser = argparse.ArgumentParser(description="Aggregate nationwide MP and PL votes per party")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Process pool size for the per-province map-reduce (1 = serial)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse area files incrementally, keeping only the fields "
+                             "analyses need")
+    args = parser.parse_args()
+    ok = calculate_nationwide_votes(workers=args.workers, streaming=args.stream)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,187 @@
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from election_data import load_area_entries
+
+# Configuration
+PL_DIR = Path("rawdata/pl")
+ELECTION66_DIR = Path("rawdata66")  # Same layout as rawdata/: mp/<area>.json, pl/<area>.json
+CANDIDATES_FILE = Path("docs/data/candidates-data.json")
+COMMON_DATA_FILE = Path("docs/data/common-data.json")
+ANOMALY_FILE = Path("docs/data/anomaly_report.json")
+OUTPUT_FILE = Path("docs/data/cross_election.json")
+
+def get_party_number(party_code: str) -> Optional[int]:
+    # PARTY-0029 -> 29
+    try:
+        return int(str(party_code).split("-")[-1])
+    except ValueError:
+        return None
+
+def build_party_map(candidates: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Election 66 party number -> Election 69 party code, taken from candidates who ran
+    for the same party in both elections (party66RefCode with switchedParty False).
+    """
+    votes: Dict[int, Counter] = defaultdict(Counter)
+    for c in candidates:
+        if c.get("party66RefCode") and c.get("switchedParty") is False:
+            votes[int(c["party66RefCode"])][c["partyCode"]] += 1
+    return {number: counter.most_common(1)[0][0] for number, counter in sorted(votes.items())}
+
+def index_candidates(candidates: List[Dict[str, Any]]) -> Dict[str, Dict[int, Dict[str, Any]]]:
+    """
+    Area code ("1001") -> ballot number -> candidate.
+    """
+    by_area: Dict[str, Dict[int, Dict[str, Any]]] = defaultdict(dict)
+    for c in candidates:
+        by_area[c["areaCode"].replace("AREA-", "")][c["number"]] = c
+    return by_area
+
+def load_vote_shares(pl_dir: Path, party_map: Optional[Dict[int, str]] = None,
+                     streaming: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Area code -> party code -> share of the area's party-list votes. With party_map the
+    party numbers are translated to Election 69 codes (unmapped ones become "66:<number>").
+    """
+    shares: Dict[str, Dict[str, float]] = {}
+    if not pl_dir.exists():
+        return shares
+    for path in sorted(f for f in pl_dir.iterdir() if f.suffix == ".json"):
+        try:
+            entries = load_area_entries(path, streaming)
+        except Exception as e:
+            print(f"Error reading {path}: {e}")
+            continue
+        votes: Dict[str, int] = defaultdict(int)
+        for e in entries:
+            code = e.get("partyCode")
+            if not code:
+                continue
+            if party_map is not None:
+                number = get_party_number(code)
+                code = party_map.get(number, f"66:{number}")
+            votes[code] += e.get("voteTotal", 0)
+        total = sum(votes.values())
+        if total > 0:
+            shares[path.stem] = {code: v / total for code, v in votes.items()}
+    return shares
+
+def swing(shares69: Dict[str, Dict[str, float]], shares66: Dict[str, Dict[str, float]],
+          area_code: str, party_code: str) -> Optional[float]:
+    # Percentage-point change in party-list share, None without data for both elections
+    if area_code not in shares69 or area_code not in shares66:
+        return None
+    change = shares69[area_code].get(party_code, 0) - shares66[area_code].get(party_code, 0)
+    return round(change * 100, 2)
+
+def classify(row: Dict[str, Any]) -> str:
+    """
+    Most likely non-number explanation for a twin-party result, if any. Number confusion
+    is only left as the explanation when the Election 66 swing could rule out the others.
+    """
+    if row["twin_is_winner_former_party"]:
+        return "former_party_loyalty"
+    if row["twin_party_won_area_66"]:
+        return "previous_seat_holder"
+    if row["twin_pl_swing"] is None:
+        return "insufficient_66_data"
+    if row["twin_pl_swing"] <= 0:
+        return "no_gain_since_66"
+    return "number_confusion_candidate"
+
+def main(streaming: bool = False) -> bool:
+    for path in (CANDIDATES_FILE, COMMON_DATA_FILE, ANOMALY_FILE):
+        if not path.exists():
+            print(f"Error: {path} not found.")
+            return False
+
+    with open(CANDIDATES_FILE, "r", encoding="utf-8") as f:
+        candidates = json.load(f).get("candidates", [])
+    with open(COMMON_DATA_FILE, "r", encoding="utf-8") as f:
+        areas = {a["code"].replace("AREA-", ""): a for a in json.load(f).get("areas", [])}
+    with open(ANOMALY_FILE, "r", encoding="utf-8") as f:
+        anomalies = json.load(f).get("anomalies", [])
+
+    # Hash indexes: every join below is a dict lookup, not a scan of the candidate list
+    party_map = build_party_map(candidates)
+    candidates_by_area = index_candidates(candidates)
+    shares69 = load_vote_shares(PL_DIR, streaming=streaming)
+    shares66 = load_vote_shares(ELECTION66_DIR / "pl", party_map, streaming)
+    if not shares66:
+        print(f"Note: No Election 66 results in {ELECTION66_DIR}/pl, swings are left empty.")
+
+    rows = []
+    for a in anomalies:
+        area_code = a["area_code"]
+        winner = candidates_by_area.get(area_code, {}).get(int(a["mp_winner_number"]), {})
+        former_party = None
+        if winner.get("switchedParty") and winner.get("party66RefCode"):
+            former_party = party_map.get(int(winner["party66RefCode"]))
+        win66_party = areas.get(area_code, {}).get("win66PartyCode") or None
+
+        row = {
+            "area_code": area_code,
+            "province_name": a.get("province_name"),
+            "mp_winner_number": a["mp_winner_number"],
+            "mp_winner_party": a["mp_winner_party"],
+            "pl_twin_party": a["pl_twin_party"],
+            "excess_votes": a.get("excess_votes", 0),
+            "winner_is_66_winner": winner.get("is66Winner"),
+            "winner_switched_party": winner.get("switchedParty"),
+            "winner_former_party": former_party,
+            "win66_party": win66_party,
+            "seat_held": win66_party == a["mp_winner_party"] if win66_party else None,
+            "twin_is_winner_former_party": former_party == a["pl_twin_party"],
+            "twin_party_won_area_66": win66_party == a["pl_twin_party"],
+            "twin_pl_swing": swing(shares69, shares66, area_code, a["pl_twin_party"]),
+            "winner_party_pl_swing": swing(shares69, shares66, area_code, a["mp_winner_party"]),
+        }
+        row["explanation"] = classify(row)
+        rows.append(row)
+
+    summary = []
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        groups[row["explanation"]].append(row)
+    for name, members in sorted(groups.items(), key=lambda item: len(item[1]), reverse=True):
+        total_excess = sum(r["excess_votes"] for r in members)
+        summary.append({
+            "explanation": name,
+            "count": len(members),
+            "total_excess_votes": round(total_excess, 2),
+            "avg_excess_votes": round(total_excess / len(members), 2),
+        })
+
+    output = {
+        "metadata": {
+            "description": "Twin-effect anomalies joined with Election 66 references",
+            "party_map_66_to_69": {str(k): v for k, v in party_map.items()},
+            "election66_areas": len(shares66),
+        },
+        "summary": summary,
+        "areas": rows,
+    }
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"Saved: {OUTPUT_FILE}")
+
+    print("\n=== Anomalies by likely explanation ===")
+    print(f"{'Explanation':<28} | {'Areas':>5} | {'Avg excess':>10}")
+    print("-" * 50)
+    for s in summary:
+        print(f"{s['explanation']:<28} | {s['count']:>5} | {s['avg_excess_votes']:>10}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Join twin-effect anomalies with Election 66 data")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse area files incrementally, keeping only the fields "
+                             "analyses need")
+    args = parser.parse_args()
+    ok = main(streaming=args.stream)
+    sys.exit(0 if ok else 1)
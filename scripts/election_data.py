@@ -0,0 +1,154 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Result snapshot published under docs/data; election_scraper.py fetches this one
+# Note: Change timestamp part (2026-02-09-19-03-03-086) to fetch updated data
+TIMESTAMP_VERSION = "2026-02-09-19-58-02-921"
+
+# Entry fields the analyses read; everything else (votePercent, ...) is dropped when streaming
+ENTRY_FIELDS = ("candidateCode", "partyCode", "voteTotal", "rank")
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def shard_by_province(paths: Iterable[Path]) -> List[List[Path]]:
+    """
+    Groups area files by province prefix, e.g. 'rawdata/mp/1001.json' -> '10'.
+    Shards are ordered by prefix and files inside a shard by name, so concatenating
+    the shards gives the same order as sorting all files.
+    """
+    shards: Dict[str, List[Path]] = {}
+    for path in sorted(paths):
+        shards.setdefault(path.stem[:2], []).append(path)
+    return [shards[prefix] for prefix in sorted(shards)]
+
+
+def map_shards(
+    func: Callable[[List[Path]], T], shards: List[List[Path]], workers: int = 1
+) -> List[T]:
+    """
+    Runs func over every shard and returns the partial results in shard order.
+    workers <= 1 runs in this process; otherwise shards go to a process pool.
+    Either way the caller merges the same partials in the same order.
+    """
+    if workers <= 1 or len(shards) <= 1:
+        return [func(shard) for shard in shards]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, shards))
+
+
+class _ChunkedJsonReader:
+    """
+    Minimal pull reader over JSON text that is read in chunks. Only the unread tail of
+    the current chunk is kept in memory, plus whatever value is being decoded.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def skip(self, char: str) -> bool:
+        """Consumes char if it is the next character."""
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, char: str) -> None:
+        if not self.skip(char):
+            raise ValueError(f"Expected {char!r}, got {self.peek()!r}")
+
+    def value(self) -> Any:
+        """Decodes the next complete JSON value, reading more chunks until it is whole."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer end may be a truncated number
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_area_entries(
+    path: Path, fields: Tuple[str, ...] = ENTRY_FIELDS, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the entries of an area file ({"area_code": ..., "entries": [...]}) one at a
+    time, keeping only `fields` of each entry. The rest of the payload is discarded as
+    soon as it is parsed, so memory does not grow with the file size.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _ChunkedJsonReader(f, chunk_size)
+        reader.expect("{")
+        while not reader.skip("}"):
+            key = reader.value()
+            reader.expect(":")
+            if key == "entries":
+                reader.expect("[")
+                while not reader.skip("]"):
+                    entry = reader.value()
+                    yield {k: entry[k] for k in fields if k in entry}
+                    reader.skip(",")
+            else:
+                reader.value()  # area_code etc. are not needed by the analyses
+            reader.skip(",")
+
+
+def load_area_entries(path: Path, streaming: bool = False) -> List[Dict[str, Any]]:
+    """
+    Returns the entries of one area file. With streaming, the file is parsed incrementally
+    and entries are trimmed to ENTRY_FIELDS; otherwise the whole file is json.load-ed.
+    """
+    if streaming:
+        return list(iter_area_entries(path))
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("entries", [])
+
+
+def write_json(path: Path, data: Any, **dump_kwargs: Any) -> None:
+    """
+    Writes data to path through a temporary file and a rename, so readers (the site,
+    publish) never see a half-written report while partial reports are being refreshed.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)  # e.g. a fresh --data-dir
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp_path, path)
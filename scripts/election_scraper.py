@@ -2,12 +2,15 @@ import requests
 import time
 import json
 import os
+import sys
 from pathlib import Path
-from typing import Union, List, Optional, Any
+from typing import Union, List, Optional, Any, Iterator, Tuple
+
+from election_data import TIMESTAMP_VERSION
 
 # Configuration
-# Note: Change timestamp part (2026-02-09-19-03-03-086) to fetch updated data
-TIMESTAMP_VERSION = "2026-02-09-19-58-02-921"
+MP_DIR = Path("rawdata/mp")
+PL_DIR = Path("rawdata/pl")
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -48,9 +51,9 @@ def fetch_json_data(endpoint_type: str, area_code: int) -> FetchResult:
 
 def save_to_json(data_type: str, area_code: int, entries: List[dict]) -> bool:
     """
-    Saves entries inside an object wrapper to rawdata/{data_type}/{area_code}.json
+    Saves entries inside an object wrapper to {MP_DIR or PL_DIR}/{area_code}.json
     """
-    directory = Path(f"rawdata/{data_type}")
+    directory = MP_DIR if data_type == "mp" else PL_DIR
     directory.mkdir(parents=True, exist_ok=True)
     
     filepath = directory / f"{area_code}.json"
@@ -69,12 +72,13 @@ def save_to_json(data_type: str, area_code: int, entries: List[dict]) -> bool:
         print(f"Failed to save {data_type.upper()} for Area {area_code}: {e}")
         return False
 
-def main():
-    start_code = 1001
-    max_code = 9999
-    
-    mp_success = 0
-    pl_success = 0
+def iter_areas(
+    start_code: int = 1001, max_code: int = 9999
+) -> Iterator[Tuple[int, FetchResult, FetchResult]]:
+    """
+    Yields (area_code, mp_entries, pl_entries) for every valid area in code order.
+    Either result may be "ERROR"; pl_entries may also be None.
+    """
     current_code = start_code
     
     while current_code <= max_code:
@@ -87,27 +91,48 @@ def main():
             print(f"  Area {current_code} is invalid. Skipping to block: {next_block}")
             current_code = next_block
             continue
-            
-        if mp_entries != "ERROR":
-            if save_to_json("mp", current_code, mp_entries):
-                mp_success += 1
 
         # 2. Fetch Party List (PL) Data
         pl_entries = fetch_json_data("pl", current_code)
-        
-        if pl_entries is not None and pl_entries != "ERROR":
-            if save_to_json("pl", current_code, pl_entries):
-                pl_success += 1
-                
-        print(f"Saved MP & PL data for {current_code}")
+
+        yield current_code, mp_entries, pl_entries
         
         current_code += 1
         # Small delay between areas
         time.sleep(0.1)
+
+def main() -> bool:
+    """
+    Downloads every area. Returns False if nothing was saved or any fetch/save failed.
+    """
+    mp_success = 0
+    pl_success = 0
+    failed_areas: List[int] = []
+    
+    for area_code, mp_entries, pl_entries in iter_areas():
+        if "ERROR" in (mp_entries, pl_entries):
+            failed_areas.append(area_code)
+
+        if mp_entries != "ERROR":
+            if save_to_json("mp", area_code, mp_entries):
+                mp_success += 1
+            else:
+                failed_areas.append(area_code)
+
+        if pl_entries is not None and pl_entries != "ERROR":
+            if save_to_json("pl", area_code, pl_entries):
+                pl_success += 1
+            else:
+                failed_areas.append(area_code)
+                
+        print(f"Saved MP & PL data for {area_code}")
     
     print("\n--- Download Complete ---")
     print(f"Total MP Files Saved: {mp_success}")
     print(f"Total PL Files Saved: {pl_success}")
+    if failed_areas:
+        print(f"Failed Areas: {', '.join(str(a) for a in sorted(set(failed_areas)))}")
+    return mp_success > 0 and not failed_areas
 
 if __name__ == "__main__":
-    main()
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,171 @@
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from election_data import TIMESTAMP_VERSION, load_area_entries
+
+# Configuration
+MP_DIR = Path("rawdata/mp")
+PL_DIR = Path("rawdata/pl")
+COMMON_DATA_FILE = Path("docs/data/common-data.json")
+ANOMALY_FILE = Path("docs/data/anomaly_report.json")
+COMPARISON_FILE = Path("docs/data/party_comparison_stats.json")
+OUTPUT_DIR = Path("export")
+
+# Columns stored dictionary-encoded (few distinct values, repeated on every row)
+DICTIONARY_COLUMNS = {
+    "ballot", "area_code", "province_code", "region_code", "party_code", "mp_winner_party",
+    "pl_twin_party", "province_id", "province_name",
+}
+
+def get_party_number(party_code: str) -> Optional[int]:
+    # PARTY-0005 -> 5
+    try:
+        return int(party_code.split("-")[-1])
+    except (AttributeError, ValueError):
+        return None
+
+def get_candidate_number(candidate_code: str, area_code: str) -> Optional[int]:
+    # CANDIDATE-MP-100105 -> 5
+    prefix = f"CANDIDATE-MP-{area_code}"
+    if candidate_code and candidate_code.startswith(prefix):
+        try:
+            return int(candidate_code[len(prefix):])
+        except ValueError:
+            return None
+    return None
+
+def load_regions() -> Dict[str, str]:
+    # Province code "10" -> region code "bangkok"
+    if not COMMON_DATA_FILE.exists():
+        return {}
+    with open(COMMON_DATA_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        p["code"].replace("PROVINCE-", ""): p.get("regionCode", "")
+        for p in data.get("provinces", [])
+    }
+
+def collect_entries(streaming: bool = False) -> Dict[str, List[Any]]:
+    """
+    One row per MP/PL result entry, as a dict of column lists.
+    """
+    regions = load_regions()
+    columns: Dict[str, List[Any]] = {
+        name: [] for name in (
+            "ballot", "area_code", "province_code", "region_code", "party_code", "party_number",
+            "candidate_code", "candidate_number", "votes", "rank",
+        )
+    }
+    for ballot, directory in (("mp", MP_DIR), ("pl", PL_DIR)):
+        if not directory.exists():
+            print(f"Warning: Directory {directory} not found, "
+                  f"no {ballot.upper()} entries exported.")
+            continue
+        for path in sorted(f for f in directory.iterdir() if f.suffix == ".json"):
+            area_code = path.stem
+            try:
+                entries = load_area_entries(path, streaming)
+            except Exception as e:
+                print(f"Error reading {path}: {e}")
+                continue
+            for e in entries:
+                party_code = e.get("partyCode") or None
+                candidate_code = e.get("candidateCode") or None
+                columns["ballot"].append(ballot)
+                columns["area_code"].append(area_code)
+                columns["province_code"].append(area_code[:2])
+                columns["region_code"].append(regions.get(area_code[:2]))
+                columns["party_code"].append(party_code)
+                columns["party_number"].append(get_party_number(party_code))
+                columns["candidate_code"].append(candidate_code)
+                columns["candidate_number"].append(get_candidate_number(candidate_code, area_code))
+                columns["votes"].append(e.get("voteTotal"))
+                columns["rank"].append(e.get("rank"))
+    return columns
+
+def rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    names: List[str] = []
+    for row in rows:
+        names.extend(k for k in row if k not in names)
+    return {name: [row.get(name) for row in rows] for name in names}
+
+def load_table(path: Path, key: str) -> Dict[str, List[Any]]:
+    if not path.exists():
+        print(f"Warning: {path} not found, skipped.")
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return rows_to_columns(json.load(f).get(key, []))
+
+def write_table(pa, name: str, columns: Dict[str, List[Any]], snapshot: str, fmt: str) -> None:
+    """
+    Writes OUTPUT_DIR/<fmt>/<name>/snapshot=<snapshot>/part-0.<fmt> (a Hive-style partition).
+    Each format has its own root so a dataset reader only sees one file type, and the
+    partition is cleared first so files from an earlier export never linger in it.
+    """
+    arrays = {}
+    for column, values in columns.items():
+        array = pa.array(values)
+        arrays[column] = array.dictionary_encode() if column in DICTIONARY_COLUMNS else array
+    table = pa.table(arrays)
+
+    directory = OUTPUT_DIR / fmt / name / f"snapshot={snapshot}"
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        path = directory / "part-0.parquet"
+        pq.write_table(table, path, compression="zstd")
+    else:
+        import pyarrow.feather as feather
+        path = directory / "part-0.arrow"
+        feather.write_feather(table, path, compression="zstd")
+    print(f"Saved: {path} ({table.num_rows:,} rows, {path.stat().st_size:,} bytes)")
+
+def main(
+    snapshot: str = TIMESTAMP_VERSION, fmt: str = "parquet", streaming: bool = False
+) -> bool:
+    """
+    Exports the entries in MP_DIR/PL_DIR under the given snapshot label. The anomaly and
+    comparison tables are the reports in docs/data, which always describe TIMESTAMP_VERSION,
+    so they are only exported for that snapshot.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("Error: pyarrow is required for columnar export. "
+              "Install with: uv sync --extra export")
+        return False
+
+    tables = {"entries": collect_entries(streaming)}
+    if snapshot == TIMESTAMP_VERSION:
+        tables["anomalies"] = load_table(ANOMALY_FILE, "anomalies")
+        tables["party_comparison"] = load_table(COMPARISON_FILE, "comparison_stats")
+    else:
+        print(f"Note: Reports in {ANOMALY_FILE.parent} are for snapshot {TIMESTAMP_VERSION}, "
+              f"only entries are exported for {snapshot}.")
+    if not tables["entries"]["ballot"]:
+        print(f"Error: No MP/PL entries found in {MP_DIR} or {PL_DIR}.")
+        return False
+    for name, columns in tables.items():
+        if columns:
+            write_table(pa, name, columns, snapshot, fmt)
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export normalized results to Parquet / Arrow")
+    parser.add_argument("--snapshot", default=TIMESTAMP_VERSION,
+                        help="Snapshot version of the data in rawdata/, used as the partition "
+                             "value (default: %(default)s)")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet",
+                        help="Parquet files or Arrow IPC (Feather v2) files")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse area files incrementally, keeping only the fields "
+                             "analyses need")
+    args = parser.parse_args()
+    ok = main(snapshot=args.snapshot, fmt=args.format, streaming=args.stream)
+    sys.exit(0 if ok else 1)
@@ -1,8 +1,13 @@
+import argparse
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict
+from functools import partial
 from typing import Dict, List, Optional, Tuple, Any
 
+from election_data import load_area_entries, map_shards, shard_by_province, write_json
+
 # Configuration
 MP_DIR = Path("rawdata/mp")
 PL_DIR = Path("rawdata/pl")
@@ -44,146 +49,185 @@ def get_candidate_number_str(candidate_code: str, area_code: str) -> Optional[st
             return None
     return None
 
-def main():
-    print(f"Scanning data from {MP_DIR} and {PL_DIR}...")
-    
-    province_map = load_province_map()
-    
-    if not MP_DIR.exists():
-        print(f"Error: Directory {MP_DIR} not found.")
-        return
-
-    mp_files = sorted([f for f in MP_DIR.iterdir() if f.suffix == ".json"])
-    anomalies: List[Dict[str, Any]] = []
-    
-    # Initialize Comparison Stats: Track votes for targeted parties
-    # Structure: { "PARTY-000X": { "twin_votes": [], "non_twin_votes": [] } }
+def new_comparison_stats(target_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+    # Running totals rather than per-area vote lists, so memory does not grow with area count
+    # Structure: { "PARTY-000X": { "twin_total": 0, "twin_count": 0, "non_twin_total": 0, ... } }
     comparison_stats: Dict[str, Dict[str, Any]] = {}
-    target_numbers = [n for n in TARGET_NUMBER_RANGE if n not in EXCLUDED_PARTIES]
     for n in target_numbers:
         pid = f"PARTY-{int(n):04d}"
-        comparison_stats[pid] = {"twin_votes": [], "non_twin_votes": [], "number": n}
+        comparison_stats[pid] = {
+            "twin_total": 0, "twin_count": 0, "non_twin_total": 0, "non_twin_count": 0, "number": n
+        }
+    return comparison_stats
+
+def analyze_area(
+    area_code: str,
+    mp_entries: List[Dict[str, Any]],
+    pl_entries: List[Dict[str, Any]],
+    target_numbers: List[str],
+    province_map: Dict[str, str],
+    comparison_stats: Dict[str, Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """
+    Analyzes one area: adds its votes to comparison_stats (in place) and returns the
+    anomaly record if the area is flagged, else None.
+    """
+    if not mp_entries:
+        return None
+
+    # 1. Identify Winner
+    winner = mp_entries[0]
+    winner_num_str = get_candidate_number_str(winner.get("candidateCode"), area_code)
+
+    if not winner_num_str:
+        return None
+
+    # --- COMPARISON DATA COLLECTION ---
+    for pid, stats in comparison_stats.items():
+        party_num = stats["number"]
+
+        # Find votes for this party in this area
+        pl_entry = next((e for e in pl_entries if e.get("partyCode") == pid), None)
+        votes = pl_entry.get("voteTotal", 0) if pl_entry else 0
+
+        if winner_num_str == party_num:
+            # This is a "Twin Area" for this party
+            stats["twin_total"] += votes
+            stats["twin_count"] += 1
+        else:
+            # This is a "Normal Area" (Non-Twin)
+            stats["non_twin_total"] += votes
+            stats["non_twin_count"] += 1
+    # ----------------------------------
+
+    # 2. Extract Winner Stats
+    winner_party_code = winner.get("partyCode", "")
+    winner_votes = winner.get("voteTotal", 0)
+
+    # Get Winner Party's PL Votes in this area
+    winner_pl_entry = next((e for e in pl_entries if e.get("partyCode") == winner_party_code), None)
+    winner_pl_votes = winner_pl_entry.get("voteTotal", 0) if winner_pl_entry else 0
+
+    # 3. Check "Twin Party" in Party List
+    # Construct the target party ID: e.g. winner #5 -> "PARTY-0005"
+    try:
+        target_party_id = f"PARTY-{int(winner_num_str):04d}"
+    except ValueError:
+        return None
+
+    # Find this party in the PL results
+    pl_twin_entry = next((e for e in pl_entries if e.get("partyCode") == target_party_id), None)
+
+    # New: Find MP Candidate for this Twin Party in the same area
+    mp_twin_entry = next((e for e in mp_entries if e.get("partyCode") == target_party_id), None)
+    mp_twin_votes = mp_twin_entry.get("voteTotal", 0) if mp_twin_entry else 0
+
+    if pl_twin_entry:
+        pl_votes = pl_twin_entry.get("voteTotal", 0)
+        pl_rank = pl_twin_entry.get("rank")
+
+        # 4. Calculate Ratio (Twin PL Votes / Winner MP Votes)
+        # Note: This is a localized ratio (Area specific), different from the global ratio in
+        # verify_hypothesis.py
+        # But the 'Anomaly' is defined by the Twin Effect mainly.
+
+        # Avoid division by zero
+        base_votes = winner_votes if winner_votes > 0 else 1
+        ratio = pl_votes / base_votes
+
+        # 5. Filter for Reporting
+        # Condition A: Winner number is 1-15 (excluding 6, 9)
+        # Condition B: The Twin Party ranks high (Top 7) OR The Twin Party gets significant votes
+
+        # target_numbers is TARGET_NUMBER_RANGE minus EXCLUDED_PARTIES
+        if winner_num_str in target_numbers:
+            # Calculate simple anomaly score:
+            # How much did the "Twin Party" overperform expectations?
+            # Expectation: Twin Party (often small) shouldn't be in Top 7 ifMP Winner is from a
+            # different party.
+
+            # Check if MP Winner Party is DIFFERENT from Twin Party
+            # (Almost always true, as Party-0005 is likely not the party of Candidate #5)
+            is_different_party = winner_party_code != target_party_id
 
-    for filename in mp_files:
+            # Filter for "Forgotten Candidates" analyses:
+            # 1. High Rank (Top 10) - Pure Twin Effect
+            # 2. Existing MP Candidate (Vote > 0) with significant PL votes (>100) - For Forgotten
+            #    Candidates table
+            is_interesting_case = pl_rank <= 10 or (mp_twin_votes > 0 and pl_votes >= 50)
+
+            if is_different_party and is_interesting_case:
+                return {
+                    "area_code": area_code,
+                    "mp_winner_number": winner_num_str,
+                    "mp_winner_party": winner_party_code,
+                    "mp_votes": winner_votes,
+                    "mp_winner_pl_votes": winner_pl_votes,
+                    "pl_twin_party": target_party_id,
+                    "pl_twin_rank": pl_rank,
+                    "pl_twin_votes": pl_votes,
+                    "mp_twin_candidate_votes": mp_twin_votes,
+                    "ratio_pl_to_mp": round(ratio, 4), # Ratio of Twin PL votes to Winner MP votes
+                    "anomaly_score": pl_votes, # Simple score: raw votes obtained by the twin party
+                    "province_id": area_code[:2],
+                    "province_name": province_map.get(area_code[:2], "Unknown")
+                }
+    return None
+
+def analyze_shard(
+    mp_paths: List[Path],
+    pl_dir: Path,
+    target_numbers: List[str],
+    province_map: Dict[str, str],
+    streaming: bool = False,
+) -> Dict[str, Any]:
+    """
+    Runs the per-area analysis over one shard of MP files and returns its partial aggregates:
+    the twin/non-twin vote totals per targeted party and the flagged anomalies, in file order.
+    """
+    anomalies: List[Dict[str, Any]] = []
+    comparison_stats = new_comparison_stats(target_numbers)
+
+    for filename in mp_paths:
         area_code = filename.stem # filename without suffix
         mp_path = filename
-        pl_path = PL_DIR / filename.name
+        pl_path = pl_dir / filename.name
 
         if not pl_path.exists():
             continue
 
         try:
-            with open(mp_path, "r", encoding="utf-8") as f:
-                mp_data = json.load(f)
-            with open(pl_path, "r", encoding="utf-8") as f:
-                pl_data = json.load(f)
+            mp_entries = load_area_entries(mp_path, streaming)
+            pl_entries = load_area_entries(pl_path, streaming)
         except Exception as e:
             print(f"Error reading {area_code}: {e}")
             continue
 
-        mp_entries = mp_data.get("entries", [])
-        pl_entries = pl_data.get("entries", [])
-        
-        if not mp_entries:
-            continue
+        anomaly = analyze_area(
+            area_code, mp_entries, pl_entries, target_numbers, province_map, comparison_stats
+        )
+        if anomaly:
+            anomalies.append(anomaly)
 
-        # 1. Identify Winner
-        winner = mp_entries[0]
-        winner_num_str = get_candidate_number_str(winner.get("candidateCode"), area_code)
-        
-        if not winner_num_str:
-            continue
+    return {"comparison_stats": comparison_stats, "anomalies": anomalies}
 
-        # --- COMPARISON DATA COLLECTION ---
-        for pid, stats in comparison_stats.items():
-            party_num = stats["number"]
-            
-            # Find votes for this party in this area
-            pl_entry = next((e for e in pl_entries if e.get("partyCode") == pid), None)
-            votes = pl_entry.get("voteTotal", 0) if pl_entry else 0
-            
-            if winner_num_str == party_num:
-                # This is a "Twin Area" for this party
-                stats["twin_votes"].append(votes)
-            else:
-                # This is a "Normal Area" (Non-Twin)
-                stats["non_twin_votes"].append(votes)
-        # ----------------------------------
-            
-        # 2. Extract Winner Stats
-        winner_party_code = winner.get("partyCode", "")
-        winner_votes = winner.get("voteTotal", 0)
-
-        # Get Winner Party's PL Votes in this area
-        winner_pl_entry = next((e for e in pl_entries if e.get("partyCode") == winner_party_code), None)
-        winner_pl_votes = winner_pl_entry.get("voteTotal", 0) if winner_pl_entry else 0
-        
-        # 3. Check "Twin Party" in Party List
-        # Construct the target party ID: e.g. winner #5 -> "PARTY-0005"
-        try:
-            target_party_id = f"PARTY-{int(winner_num_str):04d}"
-        except ValueError:
-            continue
-            
-        # Find this party in the PL results
-        pl_twin_entry = next((e for e in pl_entries if e.get("partyCode") == target_party_id), None)
-        
-        # New: Find MP Candidate for this Twin Party in the same area
-        mp_twin_entry = next((e for e in mp_entries if e.get("partyCode") == target_party_id), None)
-        mp_twin_votes = mp_twin_entry.get("voteTotal", 0) if mp_twin_entry else 0
-        
-        if pl_twin_entry:
-            pl_votes = pl_twin_entry.get("voteTotal", 0)
-            pl_rank = pl_twin_entry.get("rank")
-            
-            # 4. Calculate Ratio (Twin PL Votes / Winner MP Votes)
-            # Note: This is a localized ratio (Area specific), different from the global ratio in verify_hypothesis.py
-            # But the 'Anomaly' is defined by the Twin Effect mainly.
-            
-            # Avoid division by zero
-            base_votes = winner_votes if winner_votes > 0 else 1
-            ratio = pl_votes / base_votes
-            
-            # 5. Filter for Reporting
-            # Condition A: Winner number is 1-15 (excluding 6, 9)
-            # Condition B: The Twin Party ranks high (Top 7) OR The Twin Party gets significant votes
-            
-            is_in_target_range = winner_num_str in TARGET_NUMBER_RANGE
-            is_excluded = winner_num_str in EXCLUDED_PARTIES
-            
-            if is_in_target_range and not is_excluded:
-                # Calculate simple anomaly score:
-                # How much did the "Twin Party" overperform expectations?
-                # Expectation: Twin Party (often small) shouldn't be in Top 7 ifMP Winner is from a different party.
-                
-                # Check if MP Winner Party is DIFFERENT from Twin Party
-                # (Almost always true, as Party-0005 is likely not the party of Candidate #5)
-                is_different_party = winner_party_code != target_party_id
-                
-                # Filter for "Forgotten Candidates" analyses:
-                # 1. High Rank (Top 10) - Pure Twin Effect
-                # 2. Existing MP Candidate (Vote > 0) with significant PL votes (>100) - For Forgotten Candidates table
-                is_interesting_case = pl_rank <= 10 or (mp_twin_votes > 0 and pl_votes >= 50)
-
-                if is_different_party and is_interesting_case:
-                    anomalies.append({
-                        "area_code": area_code,
-                        "mp_winner_number": winner_num_str,
-                        "mp_winner_party": winner_party_code,
-                        "mp_votes": winner_votes,
-                        "mp_winner_pl_votes": winner_pl_votes,
-                        "pl_twin_party": target_party_id,
-                        "pl_twin_rank": pl_rank,
-                        "pl_twin_votes": pl_votes,
-                        "mp_twin_candidate_votes": mp_twin_votes,
-                        "ratio_pl_to_mp": round(ratio, 4), # Ratio of Twin PL votes to Winner MP votes
-                        "anomaly_score": pl_votes, # Simple score: raw votes obtained by the twin party
-                        "province_id": area_code[:2],
-                        "province_name": province_map.get(area_code[:2], "Unknown")
-                    })
+def report_files() -> Tuple[Path, ...]:
+    # Read at call time, since main.py may have overridden the output paths
+    return OUTPUT_ANOMALY_FILE, OUTPUT_PROVINCE_FILE, OUTPUT_MP_PARTY_FILE, OUTPUT_COMPARISON_FILE
 
+def write_reports(
+    anomalies: List[Dict[str, Any]],
+    comparison_stats: Dict[str, Dict[str, Any]],
+    progress: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Aggregates the flagged anomalies and comparison totals and writes the four report files.
+    progress is added to the anomaly report metadata (used for partial reports). Returns the
+    sorted anomalies, province stats and MP party stats.
+    """
     # Sort by 'anomaly_score' (votes obtained by the questionable party) descending
-    anomalies.sort(key=lambda x: x["anomaly_score"], reverse=True)
+    # Copies, since enrichment below depends on the areas seen so far
+    anomalies = sorted((dict(a) for a in anomalies), key=lambda x: x["anomaly_score"], reverse=True)
     
     # --- Aggregations ---
     
@@ -243,11 +287,11 @@ def main():
     # Process Comparison Stast
     final_comparison = []
     for pid, stats in comparison_stats.items():
-        twin_v = stats["twin_votes"]
-        non_twin_v = stats["non_twin_votes"]
+        twin_count = stats["twin_count"]
+        non_twin_count = stats["non_twin_count"]
         
-        avg_twin = sum(twin_v) / len(twin_v) if twin_v else 0
-        avg_non_twin = sum(non_twin_v) / len(non_twin_v) if non_twin_v else 0
+        avg_twin = stats["twin_total"] / twin_count if twin_count else 0
+        avg_non_twin = stats["non_twin_total"] / non_twin_count if non_twin_count else 0
         diff = avg_twin - avg_non_twin
         
         final_comparison.append({
@@ -256,8 +300,8 @@ def main():
             "avg_twin_votes": round(avg_twin, 2),
             "avg_non_twin_votes": round(avg_non_twin, 2),
             "diff": round(diff, 2),
-            "twin_area_count": len(twin_v),
-            "non_twin_area_count": len(non_twin_v)
+            "twin_area_count": twin_count,
+            "non_twin_area_count": non_twin_count
         })
     
     # Enrich anomalies with comparison context
@@ -277,32 +321,69 @@ def main():
 
     # Save to JSON
     # 1. Anomaly Report
+    numbers = f"{TARGET_NUMBER_RANGE[0]}-{TARGET_NUMBER_RANGE[-1]}"
+    if EXCLUDED_PARTIES:
+        numbers += f", excl {','.join(EXCLUDED_PARTIES)}"
     anomaly_data = {
         "metadata": {
             "description": "Anomaly detection report based on Twin Number Hypothesis (Buy 1 Get 2)",
-            "criteria": "Winner MP Number (1-15, excl 6,9,11) matches Top 10 Party List Number (Different Party) or has twin MP candidate with significant votes",
-            "total_areas_flagged": len(anomalies)
+            "criteria": f"Winner MP Number ({numbers}) matches Top 10 Party List Number "
+                        "(Different Party) or has twin MP candidate with significant votes",
+            "total_areas_flagged": len(anomalies),
+            **(progress or {})
         },
         "anomalies": anomalies
     }
-    with open(OUTPUT_ANOMALY_FILE, "w", encoding="utf-8") as f:
-        json.dump(anomaly_data, f, ensure_ascii=False, indent=2)
-    print(f"Saved: {OUTPUT_ANOMALY_FILE}")
+    write_json(OUTPUT_ANOMALY_FILE, anomaly_data, ensure_ascii=False, indent=2)
 
     # 2. Province Stats
-    with open(OUTPUT_PROVINCE_FILE, "w", encoding="utf-8") as f:
-        json.dump({"province_stats": sorted_provinces}, f, ensure_ascii=False, indent=2)
-    print(f"Saved: {OUTPUT_PROVINCE_FILE}")
+    write_json(OUTPUT_PROVINCE_FILE, {"province_stats": sorted_provinces},
+               ensure_ascii=False, indent=2)
 
     # 3. MP Party Stats
-    with open(OUTPUT_MP_PARTY_FILE, "w", encoding="utf-8") as f:
-        json.dump({"mp_party_stats": sorted_mp_parties}, f, ensure_ascii=False, indent=2)
-    print(f"Saved: {OUTPUT_MP_PARTY_FILE}")
+    write_json(OUTPUT_MP_PARTY_FILE, {"mp_party_stats": sorted_mp_parties},
+               ensure_ascii=False, indent=2)
 
     # 4. Comparison Stats
-    with open(OUTPUT_COMPARISON_FILE, "w", encoding="utf-8") as f:
-        json.dump({"comparison_stats": final_comparison}, f, ensure_ascii=False, indent=2)
-    print(f"Saved: {OUTPUT_COMPARISON_FILE}")
+    write_json(OUTPUT_COMPARISON_FILE, {"comparison_stats": final_comparison},
+               ensure_ascii=False, indent=2)
+
+    return anomalies, sorted_provinces, sorted_mp_parties
+
+def main(workers: int = 1, streaming: bool = False) -> bool:
+    print(f"Scanning data from {MP_DIR} and {PL_DIR}...")
+    
+    province_map = load_province_map()
+    
+    if not MP_DIR.exists():
+        print(f"Error: Directory {MP_DIR} not found.")
+        return False
+
+    mp_files = sorted([f for f in MP_DIR.iterdir() if f.suffix == ".json"])
+    anomalies: List[Dict[str, Any]] = []
+    
+    # Initialize Comparison Stats: Track votes for targeted parties
+    target_numbers = [n for n in TARGET_NUMBER_RANGE if n not in EXCLUDED_PARTIES]
+    comparison_stats = new_comparison_stats(target_numbers)
+
+    # Map: analyze each province shard (in a process pool when workers > 1)
+    # Reduce: merge partials in province order so the result matches a serial run
+    shard_func = partial(
+        analyze_shard,
+        pl_dir=PL_DIR,
+        target_numbers=target_numbers,
+        province_map=province_map,
+        streaming=streaming,
+    )
+    for part in map_shards(shard_func, shard_by_province(mp_files), workers):
+        for pid, stats in part["comparison_stats"].items():
+            for key in ("twin_total", "twin_count", "non_twin_total", "non_twin_count"):
+                comparison_stats[pid][key] += stats[key]
+        anomalies.extend(part["anomalies"])
+
+    anomalies, sorted_provinces, sorted_mp_parties = write_reports(anomalies, comparison_stats)
+    for path in report_files():
+        print(f"Saved: {path}")
         
     print(f"\nAnalysis complete. Found {len(anomalies)} anomalies.")
     
@@ -321,6 +402,15 @@ def main():
     print("-" * 80)
     for a in anomalies[:10]:
         print(f"{a['area_code']:<6} | {a['mp_winner_number']:<6} | {a['pl_twin_party']:<12} | {a['pl_twin_rank']:<10} | {a['pl_twin_votes']:<14} | {a['mp_twin_candidate_votes']:<14}")
+    return True
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate the twin-number anomaly reports")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Process pool size for the per-province map-reduce (1 = serial)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse area files incrementally, keeping only the fields "
+                             "analyses need")
+    args = parser.parse_args()
+    ok = main(workers=args.workers, streaming=args.stream)
+    sys.exit(0 if ok else 1)
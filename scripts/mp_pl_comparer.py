@@ -1,18 +1,23 @@
 import json
+import sys
 from pathlib import Path
 from typing import List, Dict, Any
 
-def compare_mp_and_pl() -> None:
+# Configuration
+MP_DIR = Path("rawdata/mp")
+PL_DIR = Path("rawdata/pl")
+EXCLUDED_PARTIES = ["6", "9", "11"]
+
+def compare_mp_and_pl() -> bool:
     """
     Compares the winning MP candidate number with the top 20 Party List party numbers.
     """
-    base_dir = Path("rawdata")
-    mp_dir = base_dir / "mp"
-    pl_dir = base_dir / "pl"
+    mp_dir = MP_DIR
+    pl_dir = PL_DIR
     
     if not mp_dir.exists() or not pl_dir.exists():
-        print("Error: rawdata/mp or rawdata/pl directory not found.")
-        return
+        print(f"Error: {mp_dir} or {pl_dir} directory not found.")
+        return False
 
     mp_files = sorted([f for f in mp_dir.iterdir() if f.suffix == ".json"])
     
@@ -68,7 +73,7 @@ def compare_mp_and_pl() -> None:
                 # "6" is United Thai Nation Party
                 # "9" is Pheu Thai Party
                 # "11" is Chart Thai Pattana Party
-                if pl_party_num in ["6", "9", "11"]:
+                if pl_party_num in EXCLUDED_PARTIES:
                     continue
                 
                 # Parse MP number (strip leading zeros for consistent comparison)
@@ -119,8 +124,9 @@ def compare_mp_and_pl() -> None:
         for party, count in sorted_parties:
             print(f"{party:<20} | {count:<10}")
     print("="*40)
+    return True
 
 if __name__ == "__main__":
     print("--- MP winning number vs Top 20 Party List comparison ---")
     print("Logic: Ignores Party 06, 09 and 11")
-    compare_mp_and_pl()
+    sys.exit(0 if compare_mp_and_pl() else 1)
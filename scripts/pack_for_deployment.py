@@ -1,26 +1,151 @@
-import os
+import hashlib
+import json
+import re
 import shutil
 from pathlib import Path
+from typing import Dict, List
+
+# Files served under their own name; everything else gets a content-hashed name
+ENTRY_FILES = {"index.html", ".nojekyll"}
+MANIFEST_FILE = "asset-manifest.json"
+MANIFEST_PLACEHOLDER = "/*ASSET_MANIFEST*/{}"
+HASH_LENGTH = 10
+# Image formats dropped when a .webp with the same name exists (the dashboard only loads .webp)
+WEBP_SUPERSEDES = {".png", ".jpg", ".jpeg"}
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def collect_assets(docs_dir: Path) -> List[Path]:
+    """
+    Lists the files under docs/ to publish, relative to docs/, skipping entry files and
+    images that have a .webp twin.
+    """
+    assets = []
+    for path in sorted(p for p in docs_dir.rglob("*") if p.is_file()):
+        rel = path.relative_to(docs_dir)
+        if rel.as_posix() in ENTRY_FILES or rel.name == MANIFEST_FILE:
+            continue
+        if rel.suffix.lower() in WEBP_SUPERSEDES and path.with_suffix(".webp").exists():
+            print(f"🗑️ Skipped {rel.as_posix()} (superseded by .webp)")
+            continue
+        assets.append(rel)
+    return assets
+
+def referenced_assets(html: str, manifest: Dict[str, str]) -> Dict[str, str]:
+    """
+    The part of the manifest index.html can ask for without the full manifest: quoted
+    literal paths ('data/province_stats.json') and template-literal prefixes
+    (`img/${code}.webp` -> every asset under img/).
+    """
+    literals = set(re.findall(r"""['"`]([\w./-]+\.\w+)['"`]""", html))
+    prefixes = {p for p in re.findall(r"`([\w./-]+)\$\{", html)}
+    return {
+        path: hashed for path, hashed in manifest.items()
+        if path in literals or any(path.startswith(prefix) for prefix in prefixes)
+    }
+
+def write_if_changed(dst: Path, content: bytes) -> bool:
+    if dst.exists() and dst.read_bytes() == content:
+        return False
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.write_bytes(content)
+    return True
+
+def build_dist(docs_dir: Path, dist_dir: Path) -> Dict[str, str]:
+    """
+    Publishes docs/ into dist/ with long-cache-friendly names, e.g.
+    'data/province_stats.json' -> 'data/province_stats.3f2a9c1b7e.json'.
+
+    Files whose hashed name already exists in dist/ are not copied again, files with
+    identical content share one hashed copy, and files left over from earlier builds are
+    removed. index.html gets the {original: hashed} entries for the assets it references
+    inlined, so the dashboard resolves its fetch() and <img> paths without an extra
+    request; everything else is looked up in asset-manifest.json on demand. Returns the
+    full manifest.
+
+    The incremental copy only saves work on a machine that keeps dist/ between builds.
+    GitHub Pages deploys always upload the whole of dist/.
+    """
+    manifest: Dict[str, str] = {}
+    by_hash: Dict[str, str] = {}
+    copied_bytes = 0
+    reused_bytes = 0
+
+    for rel in collect_assets(docs_dir):
+        src = docs_dir / rel
+        digest = content_hash(src)
+        if digest in by_hash:
+            # Same bytes under another name: point at the copy already published
+            manifest[rel.as_posix()] = by_hash[digest]
+            continue
+
+        hashed = rel.with_name(f"{rel.stem}.{digest}{rel.suffix}").as_posix()
+        by_hash[digest] = hashed
+        manifest[rel.as_posix()] = hashed
+
+        dst = dist_dir / hashed
+        size = src.stat().st_size
+        if dst.exists():
+            reused_bytes += size
+            continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dst)
+        copied_bytes += size
+
+    # Entry files keep stable names and are only rewritten when their content changes
+    html = (docs_dir / "index.html").read_text(encoding="utf-8")
+    if MANIFEST_PLACEHOLDER not in html:
+        print(f"⚠️ {MANIFEST_PLACEHOLDER} not found in index.html, asset paths are not rewritten")
+    inline = referenced_assets(html, manifest)
+    manifest_json = json.dumps(inline, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    html = html.replace(MANIFEST_PLACEHOLDER, manifest_json)
+    write_if_changed(dist_dir / "index.html", html.encode("utf-8"))
+    write_if_changed(dist_dir / ".nojekyll", b"")
+    write_if_changed(
+        dist_dir / MANIFEST_FILE,
+        json.dumps(manifest, ensure_ascii=False, sort_keys=True, indent=2).encode("utf-8"),
+    )
+
+    # Drop hashed files from previous builds
+    keep = set(manifest.values()) | ENTRY_FILES | {MANIFEST_FILE}
+    removed = 0
+    for path in sorted(dist_dir.rglob("*"), reverse=True):
+        rel = path.relative_to(dist_dir).as_posix()
+        if path.is_file() and rel not in keep:
+            path.unlink()
+            removed += 1
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+
+    print(f"✅ {len(manifest)} assets ({len(by_hash)} unique, "
+          f"{len(inline)} inlined in index.html): copied {copied_bytes:,} bytes, "
+          f"unchanged {reused_bytes:,} bytes, removed {removed} stale files")
+    return manifest
 
 def pack_site():
     # Define paths
     root_dir = Path(__file__).parent.parent
     docs_dir = root_dir / "docs"
-    data_dir = root_dir / "data"
-    
+    dist_dir = root_dir / "dist"
+
     # Files to copy from rawdata/ to docs/data/
     rawdata_files = ["focused-area.json"]
     rawdata_dir = root_dir / "rawdata"
-    
+
     # Ensure docs directory exists
     if not docs_dir.exists():
         docs_dir.mkdir()
-    
+
     # Copy data files
     docs_data_dir = docs_dir / "data"
     if not docs_data_dir.exists():
         docs_data_dir.mkdir()
-    
+
     # Copy from rawdata
     for filename in rawdata_files:
         src = rawdata_dir / filename
@@ -34,8 +159,13 @@ def pack_site():
     # Create .nojekyll
     (docs_dir / ".nojekyll").touch()
     print(f"✅ Created .nojekyll")
-    
+
     print("\n📦 Site updated in 'docs/' folder!")
 
+    # Content-hashed deployment build
+    dist_dir.mkdir(exist_ok=True)
+    build_dist(docs_dir, dist_dir)
+    print(f"🚀 Deployable site written to '{dist_dir.name}/' folder!")
+
 if __name__ == "__main__":
     pack_site()
@@ -0,0 +1,396 @@
+import argparse
+import difflib
+import hashlib
+import json
+import math
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: wall time only
+    resource = None
+
+# Configuration
+ROOT_DIR = Path(__file__).parent.parent
+FIXTURE_ARCHIVE = ROOT_DIR / "rawdata.rar"
+FIXTURE_MEMBERS = ("rawdata/mp/", "rawdata/pl/", "rawdata/common-data.json")
+REGRESSION_DIR = ROOT_DIR / "regression"
+GOLDEN_DIR = REGRESSION_DIR / "golden"
+BUDGETS_FILE = REGRESSION_DIR / "budgets.json"
+# New budgets = measured * headroom, at least measured + slack, to absorb machine noise.
+# Time is budgeted in calibration units (stage seconds / calibration seconds), so budgets
+# recorded on one machine hold on a faster or slower one.
+BUDGET_HEADROOM = 1.5
+BUDGET_SLACK_UNITS = 1.0
+BUDGET_SLACK_MB = 8.0
+CALIBRATION_ROWS = 20000
+CALIBRATION_ROUNDS = 5
+MAX_REPORTED_DIFFS = 20
+
+# --- Stages ---
+# Each runs one script in-process against the fixture, writing into out_dir
+
+def run_analyze(fixture: Path, out_dir: Path, workers: int, streaming: bool) -> None:
+    import generate_anomaly_report as report
+    report.MP_DIR, report.PL_DIR = fixture / "mp", fixture / "pl"
+    report.COMMON_DATA_FILE = fixture / "common-data.json"
+    report.OUTPUT_ANOMALY_FILE = out_dir / "anomaly_report.json"
+    report.OUTPUT_PROVINCE_FILE = out_dir / "province_stats.json"
+    report.OUTPUT_MP_PARTY_FILE = out_dir / "mp_party_stats.json"
+    report.OUTPUT_COMPARISON_FILE = out_dir / "party_comparison_stats.json"
+    report.main(workers=workers, streaming=streaming)
+
+def run_nationwide(fixture: Path, out_dir: Path, workers: int, streaming: bool) -> None:
+    import calculate_nationwide_votes as nationwide
+    nationwide.MP_DIR, nationwide.PL_DIR = fixture / "mp", fixture / "pl"
+    nationwide.OUTPUT_FILE = out_dir / "nationwide_party_stats.json"
+    nationwide.calculate_nationwide_votes(workers=workers, streaming=streaming)
+
+def run_compare(fixture: Path, out_dir: Path, workers: int, streaming: bool) -> None:
+    # Only prints; its stdout (stage log) is the output
+    import mp_pl_comparer as comparer
+    comparer.MP_DIR, comparer.PL_DIR = fixture / "mp", fixture / "pl"
+    comparer.compare_mp_and_pl()
+
+# Stage name -> (runner, output files compared with GOLDEN_DIR)
+STAGES: Dict[str, Tuple[Callable[[Path, Path, int, bool], None], List[str]]] = {
+    "analyze": (run_analyze, [
+        "anomaly_report.json", "province_stats.json", "mp_party_stats.json",
+        "party_comparison_stats.json",
+    ]),
+    "nationwide": (run_nationwide, ["nationwide_party_stats.json"]),
+    "compare": (run_compare, ["compare.txt"]),
+}
+
+Measurement = Tuple[float, Optional[float]]  # (wall seconds, peak RSS in MB or None)
+
+def measure_stage(
+    name: str, fixture: Path, out_dir: Path, workers: int, streaming: bool
+) -> Measurement:
+    """
+    Runs one stage (in a fresh interpreter, see run_measured) with stdout captured to
+    out_dir/<name>.txt. Returns wall seconds, including imports, and peak RSS in MB of
+    the largest process, this one or a --workers pool process it waited for.
+    """
+    if str(Path(__file__).parent) not in sys.path:
+        sys.path.insert(0, str(Path(__file__).parent))
+    runner, _ = STAGES[name]
+    start = time.perf_counter()
+    with open(out_dir / f"{name}.txt", "w", encoding="utf-8") as log, redirect_stdout(log):
+        runner(fixture, out_dir, workers, streaming)
+    elapsed = time.perf_counter() - start
+
+    peak_mb = None
+    if resource is not None:
+        # Pool workers are shut down (and reaped) by the time the stage returns
+        peak = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+        # KB on Linux, bytes on macOS
+        peak_mb = peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+    return elapsed, peak_mb
+
+def run_measured(
+    name: str, fixture: Path, out_dir: Path, workers: int, streaming: bool
+) -> Measurement:
+    # A new spawned process per run, so peak memory is this stage's alone and imports are cold
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(measure_stage, name, fixture, out_dir, workers, streaming).result()
+
+def calibration_workload() -> float:
+    """
+    Fixed pure-Python work shaped like the stages (JSON decoding, per-party tallies).
+    Returns its wall seconds.
+    """
+    rows = [
+        {"partyCode": f"PARTY-{i % 60:04d}", "voteTotal": i * 7 % 1000, "rank": i % 60}
+        for i in range(CALIBRATION_ROWS)
+    ]
+    text = json.dumps(rows)
+    totals: Dict[str, int] = {}
+    start = time.perf_counter()
+    for _ in range(CALIBRATION_ROUNDS):
+        for row in json.loads(text):
+            totals[row["partyCode"]] = totals.get(row["partyCode"], 0) + row["voteTotal"]
+    return time.perf_counter() - start
+
+def calibrate(repeat: int) -> float:
+    # Best of the repeats in a spawned process, like the stages themselves
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return min(pool.submit(calibration_workload).result() for _ in range(max(repeat, 3)))
+
+# --- Fixture ---
+
+def extract_fixture(archive: Path, target: Path) -> Optional[Path]:
+    try:
+        import rarfile
+    except ImportError:
+        print("Error: rarfile is required to extract the fixture. "
+              "Install with: uv sync --extra dev")
+        print("       (or extract rawdata.rar yourself and pass --fixture <dir>/rawdata)")
+        return None
+    try:
+        with rarfile.RarFile(archive) as rf:
+            for info in rf.infolist():
+                if not info.is_dir() and info.filename.startswith(FIXTURE_MEMBERS):
+                    rf.extract(info, target)
+    except rarfile.Error as e:
+        print(f"Error extracting {archive}: {e} (rarfile needs unrar, unar, 7z or bsdtar)")
+        return None
+    return target / "rawdata"
+
+def fixture_digest(fixture: Path) -> str:
+    """
+    sha256 over the fixture files the stages read (relative path + content), so goldens
+    are only compared against the data they were generated from.
+    """
+    digest = hashlib.sha256()
+    paths = [fixture / "common-data.json"]
+    for sub in ("mp", "pl"):
+        paths.extend(sorted((fixture / sub).glob("*.json")))
+    for path in paths:
+        digest.update(path.relative_to(fixture).as_posix().encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+# --- Comparison ---
+
+def json_diff(
+    expected: Any, actual: Any, tolerance: float = 0.0, limit: int = MAX_REPORTED_DIFFS
+) -> List[str]:
+    """
+    Structural diff of two parsed JSON documents. Lists are compared by position (order
+    matters), objects by key. Numbers must match exactly unless tolerance > 0; int vs float
+    and bool vs int count as differences. Returns up to limit "<path>: <reason>" lines.
+    """
+    diffs: List[str] = []
+    stack = [("$", expected, actual)]
+    while stack and len(diffs) < limit:
+        path, a, b = stack.pop()
+        if type(a) is not type(b):
+            diffs.append(
+                f"{path}: expected {type(a).__name__} {a!r:.60}, got {type(b).__name__} {b!r:.60}"
+            )
+        elif isinstance(a, dict):
+            missing = [k for k in a if k not in b]
+            extra = [k for k in b if k not in a]
+            if missing:
+                diffs.append(f"{path}: missing keys {missing[:5]}")
+            if extra:
+                diffs.append(f"{path}: unexpected keys {extra[:5]}")
+            # Reversed so the first differences in document order are reported first
+            stack.extend((f"{path}.{k}", a[k], b[k]) for k in reversed(list(a)) if k in b)
+        elif isinstance(a, list):
+            if len(a) != len(b):
+                diffs.append(f"{path}: expected {len(a)} items, got {len(b)}")
+            stack.extend(
+                (f"{path}[{i}]", a[i], b[i]) for i in reversed(range(min(len(a), len(b))))
+            )
+        elif isinstance(a, float) and tolerance > 0:
+            if not math.isclose(a, b, rel_tol=tolerance, abs_tol=tolerance):
+                diffs.append(f"{path}: expected {a!r}, got {b!r}")
+        elif a != b:
+            diffs.append(f"{path}: expected {a!r:.60}, got {b!r:.60}")
+    return diffs
+
+def compare_output(golden: Path, output: Path, tolerance: float = 0.0) -> List[str]:
+    if not golden.exists():
+        return [f"no golden file {golden.relative_to(ROOT_DIR)} (run with --update-golden)"]
+    if not output.exists():
+        return ["stage did not write this file"]
+    expected, actual = golden.read_bytes(), output.read_bytes()
+    if expected == actual:  # Fast path: byte-identical, nothing to parse
+        return []
+    if golden.suffix != ".json":
+        lines = difflib.unified_diff(
+            expected.decode("utf-8").splitlines(), actual.decode("utf-8").splitlines(),
+            n=0, lineterm="",
+        )
+        changed = [line for line in lines if not line.startswith(("---", "+++"))]
+        return changed[:MAX_REPORTED_DIFFS] or ["whitespace differs"]
+    diffs = json_diff(json.loads(expected), json.loads(actual), tolerance)
+    # Same structure and values but different bytes (key order, formatting) still changes
+    # the published file
+    return diffs or ["same data, different serialization (key order or formatting)"]
+
+# --- Budgets ---
+
+def budget_key(name: str, workers: int, streaming: bool) -> str:
+    return (
+        name + (f" --workers {workers}" if workers > 1 else "") + (" --stream" if streaming else "")
+    )
+
+def check_budget(
+    budget: Dict[str, Any], key: str, units: float, peak_mb: Optional[float]
+) -> List[str]:
+    # A stage or configuration without a recorded budget fails rather than passing unchecked
+    if budget.get("time_units") is None or (peak_mb is not None and budget.get("peak_mb") is None):
+        return [f"no budget recorded for '{key}' (run with --update-budgets to add one)"]
+    problems = []
+    if units > budget["time_units"]:
+        problems.append(f"wall time {units:.2f}x calibration over budget {budget['time_units']}x")
+    if peak_mb is not None and peak_mb > budget["peak_mb"]:
+        problems.append(f"peak memory {peak_mb:.1f} MB over budget {budget['peak_mb']} MB")
+    return problems
+
+def load_budgets() -> Dict[str, Any]:
+    if not BUDGETS_FILE.exists():
+        return {"fixture_sha256": None, "stages": {}}
+    with open(BUDGETS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main(
+    fixture: Optional[Path] = None,
+    stages: Optional[List[str]] = None,
+    repeat: int = 3,
+    workers: int = 1,
+    streaming: bool = False,
+    tolerance: float = 0.0,
+    update_golden: bool = False,
+    update_budgets: bool = False,
+    check_budgets: bool = True,
+) -> bool:
+    stages = stages or list(STAGES)
+    budgets = load_budgets()
+    failures: List[str] = []
+
+    with tempfile.TemporaryDirectory(prefix="regression-") as tmp:
+        tmp_dir = Path(tmp)
+        if fixture is None:
+            print(f"Extracting fixture from {FIXTURE_ARCHIVE.name}...")
+            fixture = extract_fixture(FIXTURE_ARCHIVE, tmp_dir / "fixture")
+            if fixture is None:
+                return False
+        fixture = fixture.resolve()
+        required = (fixture / "mp", fixture / "pl", fixture / "common-data.json")
+        missing = [p.name for p in required if not p.exists()]
+        if missing:
+            print(f"Error: Fixture {fixture} has no {', '.join(missing)}.")
+            return False
+
+        digest = fixture_digest(fixture)
+        if update_golden:
+            budgets["fixture_sha256"] = digest
+        elif budgets.get("fixture_sha256") != digest:
+            print(f"Error: Fixture {fixture} does not match the one the goldens were made from "
+                  f"({digest[:12]} != {str(budgets.get('fixture_sha256'))[:12]}).")
+            return False
+
+        calibration = calibrate(repeat)
+        print(f"Calibration: {calibration:.3f}s per unit")
+        if update_budgets:
+            budgets["calibration_seconds"] = round(calibration, 3)  # For reference only
+
+        print(f"{'Stage':<12} | {'Time (s)':>9} | {'Units':>6} | {'Budget':>6} | "
+              f"{'Peak (MB)':>9} | {'Budget':>7} | Output")
+        print("-" * 80)
+        for name in stages:
+            out_dir = tmp_dir / name
+            out_dir.mkdir()
+            # Best wall time of the repeats (least noisy); peak memory is the worst
+            runs = [run_measured(name, fixture, out_dir, workers, streaming) for _ in range(repeat)]
+            seconds = min(r[0] for r in runs)
+            units = seconds / calibration
+            peak_mb = max(r[1] for r in runs) if runs[0][1] is not None else None
+
+            problems = []
+            for filename in STAGES[name][1]:
+                if update_golden:
+                    GOLDEN_DIR.mkdir(parents=True, exist_ok=True)
+                    shutil.copy(out_dir / filename, GOLDEN_DIR / filename)
+                    continue
+                diffs = compare_output(GOLDEN_DIR / filename, out_dir / filename, tolerance)
+                if diffs:
+                    problems.append(f"{filename} differs:\n      " + "\n      ".join(diffs))
+
+            # Budgets are per configuration, e.g. "analyze" (serial) or
+            # "analyze --workers 4 --stream"
+            key = budget_key(name, workers, streaming)
+            budget = budgets["stages"].get(key, {})
+            if update_budgets:
+                budget = {
+                    "time_units": round(
+                        max(units * BUDGET_HEADROOM, units + BUDGET_SLACK_UNITS), 2
+                    )
+                }
+                if peak_mb is not None:
+                    budget["peak_mb"] = round(
+                        max(peak_mb * BUDGET_HEADROOM, peak_mb + BUDGET_SLACK_MB), 1
+                    )
+                budgets["stages"][key] = budget
+            if check_budgets:
+                problems.extend(check_budget(budget, key, units, peak_mb))
+
+            status = "updated" if update_golden else ("FAIL" if problems else "ok")
+            peak_text = f"{peak_mb:.1f}" if peak_mb is not None else "-"
+            print(f"{name:<12} | {seconds:>9.3f} | {units:>6.2f} | "
+                  f"{budget.get('time_units', '-'):>6} | {peak_text:>9} | "
+                  f"{budget.get('peak_mb', '-'):>7} | {status}")
+            failures.extend(f"{name}: {p}" for p in problems)
+
+    if update_golden or update_budgets:
+        BUDGETS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(BUDGETS_FILE, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"Saved: {BUDGETS_FILE.relative_to(ROOT_DIR)}")
+
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        return False
+    if check_budgets:
+        print("\nAll stages match the golden outputs within budget.")
+    else:
+        print("\nAll stages match the golden outputs (budgets not checked).")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check stage outputs and performance against golden files"
+    )
+    parser.add_argument("--fixture", type=Path,
+                        help="Already extracted fixture (directory with mp/, pl/, "
+                             "common-data.json); default: extract rawdata.rar")
+    parser.add_argument("--stage", action="append", choices=list(STAGES), dest="stages",
+                        help="Stage to run (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per stage; the best wall time counts")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Process pool size for the per-province map-reduce (1 = serial)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse area files incrementally, keeping only the fields "
+                             "analyses need")
+    parser.add_argument("--float-tolerance", type=float, default=0.0,
+                        help="Relative/absolute tolerance for floats (default: exact)")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="Replace the golden files (and fixture digest) with this run's "
+                             "outputs")
+    parser.add_argument("--update-budgets", action="store_true",
+                        help=f"Reset budgets to this run's measurements x {BUDGET_HEADROOM} "
+                             "(plus minimum slack)")
+    parser.add_argument("--skip-budgets", action="store_true",
+                        help="Only compare outputs, e.g. on a loaded machine")
+    args = parser.parse_args()
+    ok = main(
+        fixture=args.fixture,
+        stages=args.stages,
+        repeat=args.repeat,
+        workers=args.workers,
+        streaming=args.stream,
+        tolerance=args.float_tolerance,
+        update_golden=args.update_golden,
+        update_budgets=args.update_budgets,
+        check_budgets=not args.skip_budgets,
+    )
+    sys.exit(0 if ok else 1)
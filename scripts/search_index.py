@@ -0,0 +1,242 @@
+import json
+import shutil
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+# Configuration
+DATA_DIR = Path("docs/data")
+CANDIDATES_FILE = DATA_DIR / "candidates-data.json"
+PARTY_FILE = DATA_DIR / "party-data.json"
+COMMON_DATA_FILE = DATA_DIR / "common-data.json"
+OUTPUT_DIR = DATA_DIR / "search"
+DOC_BLOCK_SIZE = 500
+PREFIX_MARK = "^"  # Marks a token start, so "^ก" lists tokens beginning with ก (any marks)
+
+# Layout written to OUTPUT_DIR (the dashboard needs the same rules to pick a slice):
+#   manifest.json       -> {"shards": [...], "doc_blocks": N, ...}
+#   grams-<hex>.json    -> {gram: [doc_id, ...]} for grams whose first character has that codepoint
+#   docs-<block>.json   -> rows for doc ids block*DOC_BLOCK_SIZE .. (block+1)*DOC_BLOCK_SIZE-1
+# Doc rows are [kind, code, label, extra]: extra is "areaCode partyCode" for candidates,
+# the English name for parties and "" for provinces.
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFC-normalizes and casefolds text, drops zero-width characters and writes SARA AM
+    as one character (nikhahit + sara aa and U+0E33 render the same in Thai).
+    """
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    text = text.replace("\u200b", "").replace("\u200c", "").replace("\u200d", "")
+    text = text.replace("\u0e4d\u0e32", "\u0e33")
+    return " ".join(text.split())
+
+
+def split_clusters(token: str) -> List[str]:
+    """
+    Splits a token into base characters with their combining marks attached, e.g.
+    'ชื่อ' -> ['ชื่', 'อ']. Thai vowel and tone marks above/below the consonant are never
+    separated from it, so n-grams always line up with what the user typed.
+    """
+    clusters: List[str] = []
+    for ch in token:
+        if clusters and unicodedata.category(ch) == "Mn":
+            clusters[-1] += ch
+        else:
+            clusters.append(ch)
+    return clusters
+
+
+def cluster_grams(clusters: List[str]) -> List[str]:
+    # Each cluster joined with the base character of the next one, so a query whose last
+    # cluster is still missing its marks ('เชื' for 'เชื่อ') hits the same grams
+    return [clusters[i] + clusters[i + 1][0] for i in range(len(clusters) - 1)]
+
+
+def text_grams(text: str) -> Set[str]:
+    """
+    Index grams for a normalized text: the cluster bigrams of every token, plus the
+    token-start unigram (PREFIX_MARK + base character of the first cluster) for
+    one-cluster prefix queries.
+    """
+    grams: Set[str] = set()
+    for token in text.split():
+        clusters = split_clusters(token)
+        grams.add(PREFIX_MARK + clusters[0][0])
+        grams.update(cluster_grams(clusters))
+    return grams
+
+
+def query_grams(query: str) -> List[str]:
+    """
+    Grams a normalized query token must match: its cluster bigrams, or the token-start
+    unigram of its base character when the token is a single cluster. The marks that no
+    gram covers are checked against the text in SearchIndex.search.
+    """
+    clusters = split_clusters(query)
+    if len(clusters) == 1:
+        return [PREFIX_MARK + clusters[0][0]]
+    return cluster_grams(clusters)
+
+
+def shard_key(gram: str) -> str:
+    # Shard by the codepoint of the first indexed character, e.g. "^กา" -> "0e01".
+    # Only one leading mark is dropped, so a token-start caret ("^^") shards under "005e"
+    body = gram[len(PREFIX_MARK):] if gram.startswith(PREFIX_MARK) else gram
+    if not body:
+        raise ValueError(f"Cannot shard empty gram {gram!r}")
+    return f"{ord(body[0]):04x}"
+
+
+def load_documents() -> List[List[str]]:
+    """
+    Collects the searchable rows: candidates, then parties, then provinces.
+    """
+    docs: List[List[str]] = []
+    with open(CANDIDATES_FILE, "r", encoding="utf-8") as f:
+        for c in json.load(f).get("candidates", []):
+            label = f"{c.get('firstName', '')} {c.get('lastName', '')}".strip()
+            extra = f"{c.get('areaCode', '')} {c.get('partyCode', '')}"
+            docs.append(["candidate", c["code"], label, extra])
+    with open(PARTY_FILE, "r", encoding="utf-8") as f:
+        for p in json.load(f).get("parties", []):
+            docs.append(["party", p["code"], p.get("name", ""), p.get("nameEn", "")])
+    with open(COMMON_DATA_FILE, "r", encoding="utf-8") as f:
+        for p in json.load(f).get("provinces", []):
+            docs.append(["province", p["code"], p.get("name", ""), ""])
+    return docs
+
+
+def searchable_text(doc: List[str]) -> str:
+    kind, _, label, extra = doc
+    # Party English names are searchable too; candidate extras are codes, not names
+    return normalize_text(f"{label} {extra}" if kind == "party" else label)
+
+
+def build_index(docs: List[List[str]], output_dir: Path) -> Dict[str, Any]:
+    """
+    Writes the sharded gram postings, doc blocks and manifest. Returns the manifest.
+    """
+    postings: Dict[str, Set[int]] = {}
+    for doc_id, doc in enumerate(docs):
+        for gram in text_grams(searchable_text(doc)):
+            postings.setdefault(gram, set()).add(doc_id)
+
+    shards: Dict[str, Dict[str, List[int]]] = {}
+    for gram in sorted(postings):
+        shards.setdefault(shard_key(gram), {})[gram] = sorted(postings[gram])
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+
+    for key, grams in shards.items():
+        with open(output_dir / f"grams-{key}.json", "w", encoding="utf-8") as f:
+            json.dump(grams, f, ensure_ascii=False, separators=(",", ":"))
+
+    doc_blocks = (len(docs) + DOC_BLOCK_SIZE - 1) // DOC_BLOCK_SIZE
+    for block in range(doc_blocks):
+        rows = docs[block * DOC_BLOCK_SIZE:(block + 1) * DOC_BLOCK_SIZE]
+        with open(output_dir / f"docs-{block}.json", "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, separators=(",", ":"))
+
+    manifest = {
+        "version": 2,
+        "ngram": 2,
+        "prefix_mark": PREFIX_MARK,
+        "doc_block_size": DOC_BLOCK_SIZE,
+        "doc_blocks": doc_blocks,
+        "doc_count": len(docs),
+        "doc_fields": ["kind", "code", "label", "extra"],
+        "shards": sorted(shards),
+    }
+    with open(output_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+class SearchIndex:
+    """
+    Query API over a built index directory. Shards and doc blocks are loaded on first use
+    and cached, so a query only reads the slices its grams fall into.
+    """
+
+    def __init__(self, index_dir: Path = OUTPUT_DIR):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / "manifest.json", "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self._shards: Dict[str, Dict[str, List[int]]] = {}
+        self._blocks: Dict[int, List[List[str]]] = {}
+
+    def _postings(self, gram: str) -> List[int]:
+        key = shard_key(gram)
+        if key not in self._shards:
+            if key not in self.manifest["shards"]:
+                return []
+            with open(self.index_dir / f"grams-{key}.json", "r", encoding="utf-8") as f:
+                self._shards[key] = json.load(f)
+        return self._shards[key].get(gram, [])
+
+    def doc(self, doc_id: int) -> List[str]:
+        block = doc_id // self.manifest["doc_block_size"]
+        if block not in self._blocks:
+            with open(self.index_dir / f"docs-{block}.json", "r", encoding="utf-8") as f:
+                self._blocks[block] = json.load(f)
+        return self._blocks[block][doc_id % self.manifest["doc_block_size"]]
+
+    def search(
+        self, query: str, kind: Optional[str] = None, limit: int = 20
+    ) -> List[Dict[str, str]]:
+        """
+        Returns docs containing every query token as a substring (a one-character token
+        matches word starts), in index order: candidates, parties, provinces.
+        """
+        tokens = normalize_text(query).split()
+        if not tokens:
+            return []
+
+        candidates: Optional[Set[int]] = None
+        for token in tokens:
+            for gram in query_grams(token):
+                ids = set(self._postings(gram))
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+
+        results: List[Dict[str, str]] = []
+        for doc_id in sorted(candidates or []):
+            doc_kind, code, label, extra = self.doc(doc_id)
+            if kind and doc_kind != kind:
+                continue
+            # Bigram hits can come from different places in the text; confirm the match
+            text = searchable_text([doc_kind, code, label, extra])
+            words = text.split()
+            if not all(
+                any(w.startswith(t) for w in words) if len(split_clusters(t)) == 1 else t in text
+                for t in tokens
+            ):
+                continue
+            results.append({"kind": doc_kind, "code": code, "label": label, "extra": extra})
+            if len(results) >= limit:
+                break
+        return results
+
+
+def main() -> bool:
+    for path in (CANDIDATES_FILE, PARTY_FILE, COMMON_DATA_FILE):
+        if not path.exists():
+            print(f"Error: {path} not found.")
+            return False
+
+    docs = load_documents()
+    manifest = build_index(docs, OUTPUT_DIR)
+    total_bytes = sum(p.stat().st_size for p in OUTPUT_DIR.iterdir())
+    print(f"Indexed {manifest['doc_count']} documents into {len(manifest['shards'])} gram shards "
+          f"and {manifest['doc_blocks']} doc blocks ({total_bytes:,} bytes) in {OUTPUT_DIR}/")
+    return True
+
+
+if __name__ == "__main__":
+    ok = main()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,385 @@
+import argparse
+import json
+import random
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from election_data import load_area_entries
+
+# Configuration
+MP_DIR = Path("rawdata/mp")
+PL_DIR = Path("rawdata/pl")
+GEOJSON_FILE = Path("rawdata/geojson/provinces.geojson")
+COMMON_DATA_FILE = Path("docs/data/common-data.json")
+ANOMALY_FILE = Path("docs/data/anomaly_report.json")
+NEIGHBORS_FILE = Path("docs/data/spatial_neighbors.json")
+OUTPUT_FILE = Path("docs/data/spatial_stats.json")
+COORD_PRECISION = 6  # Boundary vertices closer than this many decimals count as shared
+PERMUTATIONS = 999
+SEED = 69
+SIGNIFICANCE = 0.05
+
+# --- Neighbor index ---
+
+def build_province_neighbors(geojson_file: Path) -> Dict[str, List[str]]:
+    """
+    Queen contiguity from a boundary file: two provinces are neighbors when their
+    boundaries share at least one vertex.
+    """
+    with open(geojson_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    owners: Dict[tuple, set] = defaultdict(set)
+    for feature in data.get("features", []):
+        code = str(feature["properties"].get("pro_code", "")).replace("PROVINCE-", "")
+        geometry = feature.get("geometry") or {}
+        coords = geometry.get("coordinates", [])
+        polygons = [coords] if geometry.get("type") == "Polygon" else coords
+        for polygon in polygons:
+            for ring in polygon:
+                for lon, lat in ring:
+                    owners[(round(lon, COORD_PRECISION), round(lat, COORD_PRECISION))].add(code)
+
+    neighbors: Dict[str, set] = defaultdict(set)
+    for codes in owners.values():
+        for code in codes:
+            neighbors[code] |= codes - {code}
+    return {code: sorted(neighbors[code]) for code in sorted(neighbors)}
+
+def build_area_neighbors(
+    area_provinces: Dict[str, str], province_neighbors: Dict[str, List[str]]
+) -> Dict[str, List[str]]:
+    """
+    Constituency boundaries are not available, so areas are neighbors when they are in
+    the same province or in bordering provinces.
+    """
+    areas_by_province: Dict[str, List[str]] = defaultdict(list)
+    for area, province in sorted(area_provinces.items()):
+        areas_by_province[province].append(area)
+    neighbors = {}
+    for area, province in sorted(area_provinces.items()):
+        nearby = [province] + province_neighbors.get(province, [])
+        neighbors[area] = sorted(a for p in nearby for a in areas_by_province[p] if a != area)
+    return neighbors
+
+def to_csr(neighbors: Dict[str, List[str]], ids: List[str]) -> Dict[str, List]:
+    """
+    Compressed sparse row form: neighbors of ids[i] are ids[j] for j in
+    indices[indptr[i]:indptr[i + 1]].
+    """
+    position = {unit: i for i, unit in enumerate(ids)}
+    indptr, indices = [0], []
+    for unit in ids:
+        indices.extend(sorted(position[n] for n in neighbors.get(unit, []) if n in position))
+        indptr.append(len(indices))
+    return {"ids": ids, "indptr": indptr, "indices": indices}
+
+def load_units() -> Dict[str, Any]:
+    with open(COMMON_DATA_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    provinces = {p["code"].replace("PROVINCE-", ""): p["name"] for p in data.get("provinces", [])}
+    # "AREA-1001" -> "1001", matching area_code in anomaly_report.json
+    areas = {a["code"].replace("AREA-", ""): a["provinceCode"].replace("PROVINCE-", "")
+             for a in data.get("areas", [])}
+    return {"provinces": provinces, "areas": areas}
+
+def load_neighbor_index(units: Dict[str, Any], rebuild: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Returns {"province": csr, "area": csr}, read from NEIGHBORS_FILE when cached, otherwise
+    built from GEOJSON_FILE and cached.
+    """
+    if NEIGHBORS_FILE.exists() and not rebuild:
+        with open(NEIGHBORS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if not GEOJSON_FILE.exists():
+        print(f"Error: {GEOJSON_FILE} not found (extract rawdata.rar to build the neighbor index).")
+        return None
+
+    province_neighbors = build_province_neighbors(GEOJSON_FILE)
+    area_neighbors = build_area_neighbors(units["areas"], province_neighbors)
+    index = {
+        "source": GEOJSON_FILE.name,
+        "contiguity": "queen (shared boundary vertex); areas: same or bordering province",
+        "province": to_csr(province_neighbors, sorted(units["provinces"])),
+        "area": to_csr(area_neighbors, sorted(units["areas"])),
+    }
+    with open(NEIGHBORS_FILE, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Saved: {NEIGHBORS_FILE}")
+    return index
+
+# --- Spatial autocorrelation ---
+
+def spatial_lag(csr: Dict[str, List], z: List[float]) -> List[float]:
+    """
+    Row-standardized W @ z over the CSR structure (islands get a lag of 0).
+    """
+    indptr, indices = csr["indptr"], csr["indices"]
+    lag = []
+    for i in range(len(z)):
+        start, end = indptr[i], indptr[i + 1]
+        lag.append(sum(z[j] for j in indices[start:end]) / (end - start) if end > start else 0.0)
+    return lag
+
+def center(values: List[float]) -> Optional[List[float]]:
+    # Deviations from the mean; Moran's I is scale-invariant, so no division by the std
+    n = len(values)
+    mean = sum(values) / n
+    z = [v - mean for v in values]
+    if not any(z):
+        return None  # Constant variable: autocorrelation is undefined
+    return z
+
+def pseudo_p(observed: float, simulated: List[float]) -> float:
+    # Folded permutation p-value, as in PySAL: tail on the observed side of the reference
+    larger = sum(1 for s in simulated if s >= observed)
+    if len(simulated) - larger < larger:
+        larger = len(simulated) - larger
+    return (larger + 1) / (len(simulated) + 1)
+
+def morans_i(csr: Dict[str, List], values: List[float], permutations: int, rng: random.Random):
+    """
+    Global Moran's I with row-standardized weights and a permutation p-value.
+    """
+    z = center(values)
+    if z is None:
+        return None
+    n = len(z)
+    s0 = sum(1 for i in range(n) if csr["indptr"][i + 1] > csr["indptr"][i])
+    m2 = sum(v * v for v in z)
+    # CSR rows sliced once; each permutation is one C-level gather + sum per row
+    indptr, indices = csr["indptr"], csr["indices"]
+    rows = [(i, indices[indptr[i]:indptr[i + 1]], 1 / (indptr[i + 1] - indptr[i]))
+            for i in range(n) if indptr[i + 1] > indptr[i]]
+
+    def statistic(zz: List[float]) -> float:
+        cross = sum(zz[i] * w * sum(map(zz.__getitem__, cols)) for i, cols, w in rows)
+        return (n / s0) * cross / m2
+
+    observed = statistic(z)
+    simulated = []
+    shuffled = list(z)
+    for _ in range(permutations):
+        rng.shuffle(shuffled)
+        simulated.append(statistic(shuffled))
+    expected = -1 / (n - 1)
+    mean_sim = sum(simulated) / len(simulated) if simulated else expected
+    var_sim = sum((s - mean_sim) ** 2 for s in simulated) / len(simulated) if simulated else 0
+    return {
+        "I": round(observed, 4),
+        "expected_I": round(expected, 4),
+        "z_sim": round((observed - mean_sim) / var_sim ** 0.5, 3) if var_sim > 0 else None,
+        "p_sim": round(pseudo_p(observed, simulated), 4) if simulated else None,
+    }
+
+def local_morans(csr: Dict[str, List], values: List[float], permutations: int, rng: random.Random):
+    """
+    Local Moran's I (LISA) per unit with conditional permutation p-values and the
+    HH/LL/HL/LH quadrant of significant units ("ns" otherwise).
+
+    As in PySAL, one set of random draws (of the largest neighbor count) is shared by all
+    units: unit i uses the first k_i indices of each draw into the other n - 1 values.
+    """
+    z = center(values)
+    if z is None:
+        return None
+    n = len(z)
+    m2 = sum(v * v for v in z) / n
+    lag = spatial_lag(csr, z)
+    indptr = csr["indptr"]
+    k_max = max(indptr[i + 1] - indptr[i] for i in range(n))
+    draws = [rng.sample(range(n - 1), k_max) for _ in range(permutations)] if k_max else []
+
+    results = []
+    for i in range(n):
+        k = indptr[i + 1] - indptr[i]
+        observed = z[i] * lag[i] / m2
+        p_sim = None
+        if k and draws:
+            others = z[:i] + z[i + 1:]
+            scale = z[i] / (k * m2)
+            simulated = [scale * sum(map(others.__getitem__, d[:k])) for d in draws]
+            p_sim = pseudo_p(observed, simulated)
+        if p_sim is None or p_sim > SIGNIFICANCE:
+            quadrant = "ns"
+        elif z[i] > 0:
+            quadrant = "HH" if lag[i] > 0 else "HL"
+        else:
+            quadrant = "LH" if lag[i] > 0 else "LL"
+        results.append({
+            "lisa": round(observed, 4),
+            "p_sim": round(p_sim, 4) if p_sim is not None else None,
+            "quadrant": quadrant,
+        })
+    return results
+
+# --- Variables ---
+
+def area_excess_votes(
+    anomalies: List[Dict[str, Any]], party: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Sum of excess_votes per area, optionally only for one twin party. Only flagged areas
+    have a value; see twin_differences for every twin area of a party.
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    for a in anomalies:
+        if party is None or a.get("pl_twin_party") == party:
+            totals[a["area_code"]] += a.get("excess_votes", 0)
+    return totals
+
+def get_candidate_number(candidate_code: str, area_code: str) -> Optional[str]:
+    # CANDIDATE-MP-100105 -> "5"
+    prefix = f"CANDIDATE-MP-{area_code}"
+    if candidate_code and candidate_code.startswith(prefix):
+        try:
+            return str(int(candidate_code[len(prefix):]))
+        except ValueError:
+            return None
+    return None
+
+def twin_differences(
+    parties: List[str], mp_dir: Path, pl_dir: Path
+) -> Dict[str, Dict[str, float]]:
+    """
+    Per party: {area_code: PL votes - the party's mean PL votes over non-twin areas} for
+    every twin area, i.e. every area whose MP winner has the party's ballot number. This is
+    the excess_votes of generate_anomaly_report.py, but for all twin areas rather than only
+    the flagged ones. Non-twin areas have no entry.
+    """
+    numbers = {party: str(int(party.split("-")[-1])) for party in parties}
+    twin_votes: Dict[str, Dict[str, float]] = {party: {} for party in parties}
+    non_twin_totals: Dict[str, float] = defaultdict(float)
+    non_twin_counts: Dict[str, int] = defaultdict(int)
+    for mp_path in sorted(mp_dir.glob("*.json")):
+        area_code = mp_path.stem
+        pl_path = pl_dir / mp_path.name
+        if not pl_path.exists():
+            continue
+        try:
+            mp_entries = load_area_entries(mp_path, streaming=True)
+            pl_entries = load_area_entries(pl_path, streaming=True)
+        except Exception as e:
+            print(f"Error reading {area_code}: {e}")
+            continue
+        if not mp_entries:
+            continue
+        winner = get_candidate_number(mp_entries[0].get("candidateCode"), area_code)
+        if not winner:
+            continue
+        votes = {e.get("partyCode"): e.get("voteTotal", 0) for e in pl_entries}
+        for party, number in numbers.items():
+            if number == winner:
+                twin_votes[party][area_code] = votes.get(party, 0)
+            else:
+                non_twin_totals[party] += votes.get(party, 0)
+                non_twin_counts[party] += 1
+
+    differences = {}
+    for party in parties:
+        count = non_twin_counts[party]
+        avg = non_twin_totals[party] / count if count else 0.0
+        differences[party] = {area: v - avg for area, v in twin_votes[party].items()}
+    return differences
+
+def analyze_variable(name, party, by_area, units, index, permutations, rng, area_lisa):
+    area_ids = index["area"]["ids"]
+    area_values = [by_area.get(a, 0.0) for a in area_ids]
+
+    # Province value: excess votes per constituency, so large provinces are comparable
+    province_totals: Dict[str, float] = defaultdict(float)
+    province_counts: Dict[str, int] = defaultdict(int)
+    for area, value in zip(area_ids, area_values):
+        province_totals[units["areas"][area]] += value
+        province_counts[units["areas"][area]] += 1
+    province_ids = index["province"]["ids"]
+    province_values = [
+        province_totals[p] / province_counts[p] if province_counts[p] else 0.0 for p in province_ids
+    ]
+
+    result = {
+        "variable": name,
+        "party_code": party,
+        "province": {"global": morans_i(index["province"], province_values, permutations, rng)},
+        "area": {"global": morans_i(index["area"], area_values, permutations, rng)},
+    }
+    local = local_morans(index["province"], province_values, permutations, rng)
+    if local:
+        result["province"]["local"] = [
+            {"id": p, "name": units["provinces"].get(p, p), "value": round(v, 2), **stats}
+            for p, v, stats in zip(province_ids, province_values, local)
+        ]
+    if area_lisa:
+        local = local_morans(index["area"], area_values, permutations, rng)
+        if local:
+            result["area"]["local"] = [
+                {"area_code": a, "value": round(v, 2), **stats}
+                for a, v, stats in zip(area_ids, area_values, local)
+            ]
+    return result
+
+def main(permutations: int = PERMUTATIONS, rebuild: bool = False) -> bool:
+    for path in (COMMON_DATA_FILE, ANOMALY_FILE, MP_DIR, PL_DIR):
+        if not path.exists():
+            print(f"Error: {path} not found.")
+            return False
+
+    units = load_units()
+    index = load_neighbor_index(units, rebuild)
+    if index is None:
+        return False
+
+    with open(ANOMALY_FILE, "r", encoding="utf-8") as f:
+        anomalies = json.load(f).get("anomalies", [])
+
+    parties = sorted({a["pl_twin_party"] for a in anomalies})
+    differences = twin_differences(parties, MP_DIR, PL_DIR)
+
+    rng = random.Random(SEED)
+    # Overall excess votes get area-level LISA too; per-party splits only province-level
+    variables = [analyze_variable("excess_votes", None, area_excess_votes(anomalies),
+                                  units, index, permutations, rng, area_lisa=True)]
+    for party in parties:
+        variables.append(analyze_variable(f"twin_diff:{party}", party, differences[party],
+                                          units, index, permutations, rng, area_lisa=False))
+
+    output = {
+        "metadata": {
+            "description": "Spatial autocorrelation (Moran's I / LISA) of twin-effect excess votes",
+            "variables": {
+                "excess_votes": "sum of excess_votes of the flagged anomalies in an area "
+                                "(0 in areas without one)",
+                "twin_diff:<party>": "party's PL votes minus its mean non-twin PL votes, in "
+                                     "every area whose MP winner has the party's number "
+                                     "(0 in the party's non-twin areas)",
+            },
+            "weights": "row-standardized; " + index["contiguity"],
+            "permutations": permutations,
+            "seed": SEED,
+            "significance": SIGNIFICANCE,
+        },
+        "variables": variables,
+    }
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"Saved: {OUTPUT_FILE}")
+
+    print(f"\n{'Variable':<28} | {'Level':<8} | {'Moran I':>8} | {'p (sim)':>8}")
+    print("-" * 62)
+    for v in variables:
+        for level in ("province", "area"):
+            g = v[level]["global"]
+            if g:
+                print(f"{v['variable']:<28} | {level:<8} | {g['I']:>8} | {g['p_sim']!s:>8}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Moran's I / LISA of twin-effect excess votes")
+    parser.add_argument("--permutations", type=int, default=PERMUTATIONS,
+                        help="Random permutations for pseudo p-values")
+    parser.add_argument("--rebuild-neighbors", action="store_true",
+                        help=f"Rebuild {NEIGHBORS_FILE} from {GEOJSON_FILE}")
+    args = parser.parse_args()
+    ok = main(permutations=args.permutations, rebuild=args.rebuild_neighbors)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,245 @@
+import argparse
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import calculate_nationwide_votes as nationwide
+import generate_anomaly_report as report
+from election_data import load_area_entries, write_json
+
+# Configuration
+QUEUE_SIZE = 32  # Areas buffered between download and analysis; a full queue pauses the download
+
+Entries = Optional[List[Dict[str, Any]]]
+# (area_code, mp_entries, pl_entries), entries are None if unavailable
+AreaResult = Tuple[str, Entries, Entries]
+Reports = Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]
+
+_DONE = None  # Queue sentinel
+
+def scrape_source(failed: List[str]) -> Iterator[AreaResult]:
+    # Imported here so replays do not need requests
+    import election_scraper as scraper
+    for area_code, mp_entries, pl_entries in scraper.iter_areas():
+        if "ERROR" in (mp_entries, pl_entries):
+            failed.append(str(area_code))  # Fetch failed after the area was found
+        yield (
+            str(area_code),
+            mp_entries if isinstance(mp_entries, list) else None,
+            pl_entries if isinstance(pl_entries, list) else None,
+        )
+
+def replay_source(mp_dir: Path, pl_dir: Path, streaming: bool = False) -> Iterator[AreaResult]:
+    """
+    Feeds already downloaded area files through the pipeline in area-code order, as the
+    scraper would.
+    """
+    codes = sorted({
+        f.stem for d in (mp_dir, pl_dir) if d.exists() for f in d.iterdir() if f.suffix == ".json"
+    })
+    for area_code in codes:
+        results: List[Entries] = []
+        for directory in (mp_dir, pl_dir):
+            path = directory / f"{area_code}.json"
+            entries = None
+            if path.exists():
+                try:
+                    entries = load_area_entries(path, streaming)
+                except Exception as e:
+                    print(f"Error reading {path}: {e}")
+            results.append(entries)
+        yield area_code, results[0], results[1]
+
+def produce(source: Iterator[AreaResult], areas: queue.Queue, errors: List[Exception]) -> None:
+    # Download thread: blocks on a full queue, always ends the stream with _DONE
+    try:
+        for item in source:
+            areas.put(item)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        areas.put(_DONE)
+
+def persist(pending: queue.Queue, unsaved: List[str]) -> None:
+    # Writer thread: saves raw area files so disk I/O stays off the analysis path.
+    # A failed save is recorded and the queue keeps draining, so puts never block for good.
+    import election_scraper as scraper
+    while True:
+        item = pending.get()
+        if item is _DONE:
+            return
+        area_code, mp_entries, pl_entries = item
+        for data_type, entries in (("mp", mp_entries), ("pl", pl_entries)):
+            if entries is None:
+                continue
+            saved = False
+            try:
+                saved = scraper.save_to_json(data_type, int(area_code), entries)
+            except Exception as e:
+                print(f"Failed to save {data_type.upper()} for Area {area_code}: {e}")
+            finally:
+                if not saved:
+                    unsaved.append(area_code)
+
+def feed(pending: queue.Queue, writer: threading.Thread, item: Any) -> bool:
+    # Queues item for the writer; False once the writer is gone and would never drain it
+    while writer.is_alive():
+        try:
+            pending.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+class RunningReports:
+    """
+    Running aggregates of generate_anomaly_report.py and calculate_nationwide_votes.py,
+    updated one area at a time. Areas arrive in code order, so the final reports are the
+    same as the batch scripts' output over the same data.
+    """
+
+    def __init__(self) -> None:
+        self.province_map = report.load_province_map()
+        self.target_numbers = [
+            n for n in report.TARGET_NUMBER_RANGE if n not in report.EXCLUDED_PARTIES
+        ]
+        self.comparison_stats = report.new_comparison_stats(self.target_numbers)
+        self.anomalies: List[Dict[str, Any]] = []
+        self.pl_party_votes: Dict[str, int] = {}
+        self.mp_party_votes: Dict[str, int] = {}
+        self.areas = 0
+        self.provinces: List[str] = []
+        self.last_area: Optional[str] = None
+
+    def add(self, area_code: str, mp_entries: Entries, pl_entries: Entries) -> None:
+        if area_code[:2] not in self.provinces:
+            self.provinces.append(area_code[:2])
+        self.areas += 1
+        self.last_area = area_code
+
+        if mp_entries is not None:
+            nationwide.add_party_votes(self.mp_party_votes, mp_entries)
+        if pl_entries is not None:
+            nationwide.add_party_votes(self.pl_party_votes, pl_entries)
+        if mp_entries is not None and pl_entries is not None:
+            anomaly = report.analyze_area(
+                area_code, mp_entries, pl_entries,
+                self.target_numbers, self.province_map, self.comparison_stats,
+            )
+            if anomaly:
+                self.anomalies.append(anomaly)
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "partial": True,
+            "areas_processed": self.areas,
+            "provinces_processed": len(self.provinces),
+            "last_area": self.last_area,
+        }
+
+    def write(self, final: bool = False) -> Reports:
+        """
+        Writes all report files. Partial reports carry progress metadata; final ones are
+        identical to the batch output.
+        """
+        progress = None if final else self.progress()
+        results = report.write_reports(self.anomalies, self.comparison_stats, progress)
+        output_data = nationwide.summarize_party_votes(
+            self.pl_party_votes, self.mp_party_votes, verbose=final
+        )
+        if progress:
+            output_data["progress"] = progress
+        write_json(nationwide.OUTPUT_FILE, output_data, indent=2)
+        return results
+
+def main(replay: bool = False, streaming: bool = False, queue_size: int = QUEUE_SIZE) -> bool:
+    """
+    Downloads (or, with replay, re-reads) areas on a producer thread and analyzes them as
+    they arrive. Partial reports are written whenever a province is complete. Returns
+    False if nothing arrived or any download or save failed; the reports then stay marked
+    partial.
+    """
+    failed_areas: List[str] = []
+    unsaved: List[str] = []
+    if replay:
+        print(f"Replaying data from {report.MP_DIR} and {report.PL_DIR}...")
+        source = replay_source(report.MP_DIR, report.PL_DIR, streaming)
+    else:
+        print("Scraping and analyzing areas as they arrive...")
+        source = scrape_source(failed_areas)
+
+    areas: queue.Queue = queue.Queue(maxsize=queue_size)
+    errors: List[Exception] = []
+    producer = threading.Thread(
+        target=produce, args=(source, areas, errors), name="download", daemon=True
+    )
+    producer.start()
+
+    # Replayed files are already on disk, so only live downloads are persisted
+    pending: Optional[queue.Queue] = None
+    writer = None
+    if not replay:
+        pending = queue.Queue(maxsize=queue_size)
+        writer = threading.Thread(
+            target=persist, args=(pending, unsaved), name="persist", daemon=True
+        )
+        writer.start()
+
+    running = RunningReports()
+    while True:
+        item = areas.get()
+        if item is _DONE:
+            break
+        if running.provinces and item[0][:2] != running.provinces[-1]:
+            running.write()
+            print(f"Partial reports: {running.areas} areas, {len(running.provinces)} provinces "
+                  f"(through {running.last_area}), {len(running.anomalies)} anomalies")
+        running.add(*item)
+        if pending is not None and not feed(pending, writer, item):
+            unsaved.append(item[0])
+
+    if pending is not None:
+        feed(pending, writer, _DONE)
+        writer.join()
+        # Areas still queued when the writer died were never saved
+        while not pending.empty():
+            unsaved.append(pending.get_nowait()[0])
+    producer.join()
+
+    if errors or failed_areas or unsaved:
+        running.write()
+        if errors:
+            print(f"Error: Download stopped after {running.areas} areas: {errors[0]}")
+        if failed_areas:
+            print(f"Error: Failed to download areas: {', '.join(failed_areas)}")
+        if unsaved:
+            print(f"Error: Failed to save areas: {', '.join(dict.fromkeys(unsaved))}")
+        print("Reports are left marked as partial.")
+        return False
+    if not running.areas:
+        print("No areas received.")
+        return False
+
+    anomalies, sorted_provinces, _ = running.write(final=True)
+    for path in (*report.report_files(), nationwide.OUTPUT_FILE):
+        print(f"Saved: {path}")
+    print(f"\nAnalysis complete. {running.areas} areas, found {len(anomalies)} anomalies.")
+    print("\n=== Top 5 Provinces by Anomalies ===")
+    for p in sorted_provinces[:5]:
+        print(f"{p['name']}: {p['count']} areas, {p['total_ghost_votes']} ghost votes")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape and analyze areas as they arrive")
+    parser.add_argument("--replay", action="store_true",
+                        help="Feed the files already in rawdata/ instead of downloading")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse replayed area files incrementally, keeping only the fields "
+                             "analyses need")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="Areas buffered between download and analysis")
+    args = parser.parse_args()
+    ok = main(replay=args.replay, streaming=args.stream, queue_size=args.queue_size)
+    sys.exit(0 if ok else 1)
@@ -1,6 +1,10 @@
-import json
+import argparse
+import sys
 from pathlib import Path
 from collections import defaultdict
+from functools import partial
+
+from election_data import load_area_entries, map_shards, shard_by_province
 
 # Configuration
 MP_DIR = Path("rawdata/mp")
@@ -31,36 +35,32 @@ def get_candidate_number(candidate_code, area_code):
             return None
     return None
 
-def analyze():
-    print(f"Loading data from {MP_DIR} and {PL_DIR}...")
-    
-    mp_files = sorted([f for f in MP_DIR.iterdir() if f.suffix == ".json"])
-    if not mp_files:
-        print("No MP data found.")
-        return
-
+def analyze_shard(mp_paths, pl_dir, excluded=EXCLUDED_PARTIES, streaming=False):
+    """
+    Aggregates MP/PL votes per party suffix and collects Type 1 anomalies for one shard
+    of MP files. Returns the partial results for analyze() to merge.
+    """
     party_mp_votes = defaultdict(int)
     party_pl_votes = defaultdict(int)
     type1_anomalies = [] 
 
     processed_count = 0
     
-    for filename in mp_files:
+    for filename in mp_paths:
         area_code = filename.stem
         mp_path = filename
-        pl_path = PL_DIR / filename.name
+        pl_path = pl_dir / filename.name
 
         if not pl_path.exists():
             continue
 
         try:
-            with open(mp_path, "r", encoding="utf-8") as f: mp_data = json.load(f)
-            with open(pl_path, "r", encoding="utf-8") as f: pl_data = json.load(f)
+            mp_entries = load_area_entries(mp_path, streaming)
+            pl_entries = load_area_entries(pl_path, streaming)
         except Exception:
             continue
 
         # 1. Process MP Votes
-        mp_entries = mp_data.get("entries", [])
         winner_number = None
 
         if mp_entries:
@@ -77,7 +77,6 @@ def analyze():
                     party_mp_votes[suffix] += vote
 
         # 2. Process PL Votes
-        pl_entries = pl_data.get("entries", [])
         for entry in pl_entries:
             p_code = entry.get("partyCode")
             vote = entry.get("voteTotal", 0)
@@ -93,7 +92,7 @@ def analyze():
             found = next((e for e in pl_entries if e.get("partyCode") == target_party_code), None)
             if found:
                 rank = found.get("rank")
-                if winner_number not in EXCLUDED_PARTIES and rank <= 7:
+                if winner_number not in excluded and rank <= 7:
                      type1_anomalies.append({
                         "area": area_code,
                         "mp_num": winner_number,
@@ -104,6 +103,42 @@ def analyze():
 
         processed_count += 1
 
+    return {
+        "party_mp_votes": dict(party_mp_votes),
+        "party_pl_votes": dict(party_pl_votes),
+        "type1_anomalies": type1_anomalies,
+        "processed_count": processed_count,
+    }
+
+def analyze(workers=1, streaming=False):
+    print(f"Loading data from {MP_DIR} and {PL_DIR}...")
+    
+    if not MP_DIR.exists():
+        print(f"Error: Directory {MP_DIR} not found.")
+        return False
+    mp_files = sorted([f for f in MP_DIR.iterdir() if f.suffix == ".json"])
+    if not mp_files:
+        print("No MP data found.")
+        return False
+
+    party_mp_votes = defaultdict(int)
+    party_pl_votes = defaultdict(int)
+    type1_anomalies = [] 
+
+    processed_count = 0
+    
+    # Map over province shards (process pool when workers > 1), merge in province order
+    shard_func = partial(
+        analyze_shard, pl_dir=PL_DIR, excluded=EXCLUDED_PARTIES, streaming=streaming
+    )
+    for part in map_shards(shard_func, shard_by_province(mp_files), workers):
+        for suffix, vote in part["party_mp_votes"].items():
+            party_mp_votes[suffix] += vote
+        for suffix, vote in part["party_pl_votes"].items():
+            party_pl_votes[suffix] += vote
+        type1_anomalies.extend(part["type1_anomalies"])
+        processed_count += part["processed_count"]
+
     print(f"\nProcessed {processed_count} areas.")
     
     # --- REPORTING ---
@@ -140,6 +175,15 @@ def analyze():
         elif ratio > 20: verdict = "น่าสงสัย"
         
         print(f"{suffix:<6} | {mp_v:<12} | {pl_v:<12} | {ratio:.1f}x      | {verdict}")
+    return True
 
 if __name__ == "__main__":
-    analyze()
+    parser = argparse.ArgumentParser(description="Verify the twin-number and vote-ratio hypotheses")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Process pool size for the per-province map-reduce (1 = serial)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse area files incrementally, keeping only the fields "
+                             "analyses need")
+    args = parser.parse_args()
+    ok = analyze(workers=args.workers, streaming=args.stream)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,257 @@
+import argparse
+import json
+import sys
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from election_data import load_area_entries, map_shards, shard_by_province
+
+# Configuration
+MP_DIR = Path("rawdata/mp")
+PL_DIR = Path("rawdata/pl")
+OUTPUT_FILE = Path("docs/data/vote_flows.json")
+MAX_NUMBER = 15  # Ballot/party numbers 1-15 get their own row/column, higher ones share "16+"
+RIDGE = 0.05  # Pull of each area's matrix toward the national one
+NATIONAL_ITERATIONS = 5000
+AREA_ITERATIONS = 50
+TOLERANCE = 1e-7
+
+# Row r: MP candidates with ballot number r+1. Column k: PL party number k+1. Last = "16+"
+LABELS = [str(i) for i in range(1, MAX_NUMBER + 1)] + [f"{MAX_NUMBER + 1}+"]
+SIZE = len(LABELS)
+
+Matrix = List[List[float]]
+
+def number_index(number: int) -> int:
+    return min(number, MAX_NUMBER + 1) - 1
+
+def get_candidate_number(candidate_code: str, area_code: str) -> Optional[int]:
+    # CANDIDATE-MP-100105 -> 5
+    prefix = f"CANDIDATE-MP-{area_code}"
+    if candidate_code and candidate_code.startswith(prefix):
+        try:
+            return int(candidate_code[len(prefix):])
+        except ValueError:
+            return None
+    return None
+
+def get_party_number(party_code: str) -> Optional[int]:
+    # PARTY-0005 -> 5
+    try:
+        return int(party_code.split("-")[-1])
+    except (AttributeError, ValueError):
+        return None
+
+def load_shard_shares(
+    mp_paths: List[Path], pl_dir: Path, streaming: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Per area: MP vote shares by ballot number (m) and PL vote shares by party number (p),
+    both over the SIZE categories and summing to 1.
+    """
+    areas = []
+    for mp_path in mp_paths:
+        area_code = mp_path.stem
+        pl_path = pl_dir / mp_path.name
+        if not pl_path.exists():
+            continue
+        try:
+            mp_entries = load_area_entries(mp_path, streaming)
+            pl_entries = load_area_entries(pl_path, streaming)
+        except Exception as e:
+            print(f"Error reading {area_code}: {e}")
+            continue
+
+        m = [0.0] * SIZE
+        for e in mp_entries:
+            number = get_candidate_number(e.get("candidateCode"), area_code)
+            if number:
+                m[number_index(number)] += e.get("voteTotal", 0)
+        p = [0.0] * SIZE
+        for e in pl_entries:
+            number = get_party_number(e.get("partyCode"))
+            if number:
+                p[number_index(number)] += e.get("voteTotal", 0)
+
+        mp_total, pl_total = sum(m), sum(p)
+        if mp_total <= 0 or pl_total <= 0:
+            continue
+        winner = get_candidate_number(mp_entries[0].get("candidateCode"), area_code)
+        areas.append({
+            "area_code": area_code,
+            "winner_number": winner,
+            "m": [v / mp_total for v in m],
+            "p": [v / pl_total for v in p],
+        })
+    return areas
+
+def project_simplex(v):
+    """
+    Euclidean projection of every row of v (..., SIZE) onto {x >= 0, sum(x) = 1}
+    (sort-based, Duchi et al. 2008), for any number of leading batch dimensions.
+    """
+    import numpy as np
+    u = -np.sort(-v, axis=-1)
+    cumulative = np.cumsum(u, axis=-1) - 1
+    ranks = np.arange(1, v.shape[-1] + 1)
+    # Largest i with u_i > (cumulative_i - 1) / i; u_1 always qualifies
+    rho = np.count_nonzero(u * ranks > cumulative, axis=-1, keepdims=True)
+    theta = np.take_along_axis(cumulative, rho - 1, axis=-1) / rho
+    return np.maximum(v - theta, 0.0)
+
+def fit_national(M, P) -> Tuple[Any, int]:
+    """
+    Row-stochastic T minimizing sum over areas of ||m_a T - p_a||^2, by projected gradient.
+    M and P hold one area's MP / PL shares per row. The data enter only through G = M'M
+    and H = M'P, so each iteration costs O(SIZE^3) regardless of how many areas there are.
+    """
+    import numpy as np
+    G = M.T @ M
+    H = M.T @ P
+    # Step 1/L with L = 2 * largest eigenvalue of G
+    step = 1 / (2 * (np.linalg.eigvalsh(G)[-1] or 1.0))
+
+    # Accelerated projected gradient (FISTA): gradient taken at the extrapolated point Y
+    T = np.full((SIZE, SIZE), 1 / SIZE)
+    Y = T
+    t = 1.0
+    for iteration in range(1, NATIONAL_ITERATIONS + 1):
+        new_T = project_simplex(Y - step * 2 * (G @ Y - H))
+        change = np.abs(new_T - T).max()
+        new_t = (1 + (1 + 4 * t * t) ** 0.5) / 2
+        Y = new_T + (t - 1) / new_t * (new_T - T)
+        T, t = new_T, new_t
+        if change < TOLERANCE:
+            break
+    return T, iteration
+
+def fit_areas(areas: List[Dict[str, Any]], national, ridge: float = RIDGE):
+    """
+    Per-area T_a minimizing ||m_a T_a - p_a||^2 + ridge * ||T_a - T||^2 over row-stochastic
+    matrices, solved for all given areas at once as an (areas, SIZE, SIZE) array.
+
+    Without the sign constraint the solution is a rank-one update of the national T:
+    T_a = T + m_a' (p_a - m_a T) / (ridge + |m_a|^2), and its rows still sum to 1. That
+    update is projected onto the simplex and refined with a few projected-gradient steps.
+    """
+    import numpy as np
+    M = np.array([a["m"] for a in areas])
+    P = np.array([a["p"] for a in areas])
+    norm = (M * M).sum(axis=1)
+    c = (P - M @ national) / (ridge + norm)[:, None]
+    T = project_simplex(national + M[:, :, None] * c[:, None, :])
+
+    # No candidate with a ballot number: that row keeps the national prior
+    fielded = M[:, :, None] > 0
+    step = (1 / (2 * (norm + ridge)))[:, None, None]
+    for _ in range(AREA_ITERATIONS):
+        residual = np.einsum("aj,ajk->ak", M, T) - P
+        gradient = 2 * (M[:, :, None] * residual[:, None, :] + ridge * (T - national))
+        T = np.where(fielded, project_simplex(T - step * gradient), national)
+    return T
+
+def fit_area_shard(
+    areas: List[Dict[str, Any]], national: Matrix, ridge: float = RIDGE
+) -> List[Dict[str, Any]]:
+    """
+    Fits a batch of areas (fit_areas) and returns their twin shares and winner flows.
+    """
+    import numpy as np
+    if not areas:
+        return []
+    T = fit_areas(areas, np.array(national), ridge)
+
+    results = []
+    for a, matrix in zip(areas, T.tolist()):
+        winner = a["winner_number"]
+        row = number_index(winner) if winner else None
+        results.append({
+            "area_code": a["area_code"],
+            "winner_number": winner,
+            # Share of ballot-number-r MP voters casting PL for party number r, r = 1..15
+            "twin_share": {
+                LABELS[r]: round(matrix[r][r], 4) for r in range(MAX_NUMBER) if a["m"][r] > 0
+            },
+            "winner_flows": (
+                {LABELS[k]: round(matrix[row][k], 4) for k in range(SIZE)}
+                if row is not None else None
+            ),
+        })
+    return results
+
+def main(workers: int = 1, streaming: bool = False, ridge: float = RIDGE) -> bool:
+    try:
+        import numpy as np
+    except ImportError:
+        print("Error: numpy is required for the vote flow estimator. "
+              "Install with: uv sync --extra flows")
+        return False
+
+    print(f"Loading data from {MP_DIR} and {PL_DIR}...")
+    if not MP_DIR.exists():
+        print(f"Error: Directory {MP_DIR} not found.")
+        return False
+
+    mp_files = sorted([f for f in MP_DIR.iterdir() if f.suffix == ".json"])
+    shards = shard_by_province(mp_files)
+
+    # Map 1: load per-area shares; the national fit then needs all areas at once
+    load_func = partial(load_shard_shares, pl_dir=PL_DIR, streaming=streaming)
+    area_shards = map_shards(load_func, shards, workers)
+    areas = [a for shard in area_shards for a in shard]
+    if not areas:
+        print("No MP/PL data found.")
+        return False
+
+    M = np.array([a["m"] for a in areas])
+    P = np.array([a["p"] for a in areas])
+    fitted, iterations = fit_national(M, P)
+    national = fitted.tolist()
+    print(f"National transfer matrix fitted over {len(areas)} areas ({iterations} iterations)")
+
+    # Map 2: per-area fits as one batch, or one batch per province shard across the pool
+    batches = area_shards if workers > 1 else [areas]
+    fit_func = partial(fit_area_shard, national=national, ridge=ridge)
+    area_results = [r for part in map_shards(fit_func, batches, workers) for r in part]
+
+    output = {
+        "metadata": {
+            "description": (
+                "Ecological inference of MP ballot number -> party-list party vote flows"
+            ),
+            "rows": "MP candidate ballot number",
+            "columns": "Party-list party number",
+            "labels": LABELS,
+            "ridge": ridge,
+            "areas": len(areas),
+        },
+        "national": {
+            "matrix": [[round(v, 4) for v in row] for row in national],
+            "twin_share": {LABELS[r]: round(national[r][r], 4) for r in range(MAX_NUMBER)},
+        },
+        "areas": area_results,
+    }
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"Saved: {OUTPUT_FILE}")
+
+    print("\n=== National share of MP #N voters casting PL for party #N ===")
+    print(f"{'Number':<8} | {'Twin share':>10}")
+    print("-" * 24)
+    for r in range(MAX_NUMBER):
+        print(f"{LABELS[r]:<8} | {national[r][r]:>10.2%}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate MP -> party-list vote flows")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Process pool size for the per-province map-reduce (1 = serial)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse area files incrementally, keeping only the fields "
+                             "analyses need")
+    parser.add_argument("--ridge", type=float, default=RIDGE,
+                        help="Shrinkage of each area's matrix toward the national matrix")
+    args = parser.parse_args()
+    ok = main(workers=args.workers, streaming=args.stream, ridge=args.ridge)
+    sys.exit(0 if ok else 1)
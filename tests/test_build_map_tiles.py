@@ -0,0 +1,65 @@
+import pytest
+from build_map_tiles import (
+    point_segment_distance,
+    polygons_bbox,
+    polygons_centroid,
+    quantize_ring,
+    simplify_line,
+    simplify_polygons,
+)
+
+
+def square(x, y, size):
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size), (x, y)]
+
+
+def test_simplify_line_drops_collinear_points():
+    line = [(0.0, 0.0), (1.0, 0.0), (2.0, 0.0), (3.0, 0.0), (3.0, 1.0), (3.0, 2.0)]
+    assert simplify_line(line, 0.01) == [(0.0, 0.0), (3.0, 0.0), (3.0, 2.0)]
+    assert simplify_line(line[:2], 0.01) == line[:2]
+
+
+def test_simplify_line_respects_tolerance():
+    line = [(x / 10, 0.3 * ((x * 7) % 5 - 2) / 2) for x in range(50)]
+    for tolerance in (0.05, 0.2, 0.5):
+        kept = simplify_line(line, tolerance)
+        assert kept[0] == line[0] and kept[-1] == line[-1]
+        # Every dropped point lies within tolerance of the segment that replaced it
+        for p in line:
+            after = next(i for i, k in enumerate(kept) if k[0] >= p[0])
+            a, b = kept[max(after - 1, 0)], kept[after]
+            assert point_segment_distance(p, a, b) <= tolerance
+    assert len(simplify_line(line, 0.5)) < len(simplify_line(line, 0.05)) < len(line)
+
+
+def test_quantize_ring_drops_collapsed_points():
+    ring = [(100.0001, 13.0001), (100.0004, 13.0002), (100.01, 13.0), (100.0, 13.0)]
+    assert quantize_ring(ring, 2) == [(100.0, 13.0), (100.01, 13.0), (100.0, 13.0)]
+
+
+def test_polygons_centroid_square_and_hole():
+    assert polygons_centroid([[square(0, 0, 4)]]) == pytest.approx((2.0, 2.0))
+    # A 2x2 hole in the lower-left corner moves the centroid up and right:
+    # (16 * (2, 2) - 4 * (1, 1)) / 12
+    holed = [[square(0, 0, 4), square(0, 0, 2)]]
+    assert polygons_centroid(holed) == pytest.approx((28 / 12, 28 / 12))
+    # Orientation does not matter
+    assert polygons_centroid([[square(0, 0, 4)[::-1]]]) == pytest.approx((2.0, 2.0))
+
+
+def test_polygons_bbox_uses_outer_rings():
+    polygons = [[square(1, 2, 1)], [square(5, -1, 2), square(5.5, -0.5, 0.5)]]
+    assert polygons_bbox(polygons) == [1, -1, 7, 3]
+
+
+def test_simplify_polygons_keeps_largest_when_all_vanish():
+    # Both islands are far below one pixel at zoom 9 (~0.0027 degrees)
+    small, larger = square(100.0, 13.0, 0.001), square(101.0, 13.0, 0.002)
+    assert simplify_polygons([[small], [larger]], 9) == [[quantize_ring(larger, 3)]]
+
+
+def test_simplify_polygons_drops_small_islands_and_holes():
+    mainland = square(100.0, 13.0, 1.0)
+    island = square(102.0, 13.0, 0.001)
+    result = simplify_polygons([[mainland, square(100.2, 13.2, 0.001)], [island]], 9)
+    assert result == [[quantize_ring(mainland, 3)]]
@@ -0,0 +1,152 @@
+import json
+
+import cross_election
+import pytest
+from cross_election import build_party_map, classify, index_candidates, load_vote_shares, swing
+
+
+def candidate(area, number, party, ref66=None, switched=None, is66=False):
+    return {
+        "areaCode": f"AREA-{area}",
+        "number": number,
+        "partyCode": party,
+        "party66RefCode": ref66,
+        "switchedParty": switched,
+        "is66Winner": is66,
+    }
+
+
+CANDIDATES = [
+    # Party 66 #29 became PARTY-0037 (two stayers), one defector does not count
+    candidate("1001", 1, "PARTY-0037", ref66="29", switched=False, is66=True),
+    candidate("1001", 2, "PARTY-0009", ref66="29", switched=True),
+    candidate("1002", 1, "PARTY-0037", ref66="29", switched=False),
+    candidate("1002", 3, "PARTY-0009", ref66="22", switched=False),
+    candidate("1002", 4, "PARTY-0004"),
+]
+
+
+def test_build_party_map_uses_stayers_only():
+    assert build_party_map(CANDIDATES) == {22: "PARTY-0009", 29: "PARTY-0037"}
+
+
+def test_index_candidates():
+    by_area = index_candidates(CANDIDATES)
+    assert sorted(by_area) == ["1001", "1002"]
+    assert by_area["1002"][3]["partyCode"] == "PARTY-0009"
+    assert 4 not in by_area["1001"]
+
+
+def test_load_vote_shares_translates_66_numbers(tmp_path):
+    pl = tmp_path / "pl"
+    pl.mkdir()
+    entries = [
+        {"partyCode": "PARTY-0029", "voteTotal": 60},
+        {"partyCode": "PARTY-0050", "voteTotal": 40},
+    ]
+    (pl / "1001.json").write_text(json.dumps({"entries": entries}), encoding="utf-8")
+    (pl / "1002.json").write_text(json.dumps({"entries": []}), encoding="utf-8")
+    shares = load_vote_shares(pl, {29: "PARTY-0037"})
+    # Areas without votes are left out; unmapped numbers keep an "66:" code
+    assert shares == {"1001": {"PARTY-0037": 0.6, "66:50": 0.4}}
+    assert load_vote_shares(tmp_path / "missing") == {}
+
+
+def test_swing():
+    shares69 = {"1001": {"PARTY-0037": 0.55}, "1002": {}}
+    shares66 = {"1001": {"PARTY-0037": 0.4}}
+    assert swing(shares69, shares66, "1001", "PARTY-0037") == pytest.approx(15.0)
+    assert swing(shares69, shares66, "1001", "PARTY-0009") == 0
+    assert swing(shares69, shares66, "1002", "PARTY-0037") is None
+
+
+@pytest.mark.parametrize(
+    "former, won66, twin_swing, expected",
+    [
+        (True, True, 5.0, "former_party_loyalty"),
+        (False, True, 5.0, "previous_seat_holder"),
+        (False, False, -1.0, "no_gain_since_66"),
+        (False, False, 0.0, "no_gain_since_66"),
+        (False, False, 2.5, "number_confusion_candidate"),
+        (False, False, None, "insufficient_66_data"),
+        (True, False, None, "former_party_loyalty"),
+    ],
+)
+def test_classify_priority(former, won66, twin_swing, expected):
+    row = {
+        "twin_is_winner_former_party": former,
+        "twin_party_won_area_66": won66,
+        "twin_pl_swing": twin_swing,
+    }
+    assert classify(row) == expected
+
+
+def test_main_joins_anomalies(tmp_path, monkeypatch):
+    def dump(path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return path
+
+    def pl_file(directory, area, votes):
+        entries = [{"partyCode": code, "voteTotal": v} for code, v in votes.items()]
+        dump(directory / f"{area}.json", {"entries": entries})
+
+    anomalies = [
+        # Winner #2 switched from 66 party #29 (now PARTY-0037), whose PL took the twin votes
+        {
+            "area_code": "1001",
+            "mp_winner_number": "2",
+            "mp_winner_party": "PARTY-0009",
+            "pl_twin_party": "PARTY-0037",
+            "excess_votes": 10,
+        },
+        # No Election 66 link at all
+        {
+            "area_code": "1002",
+            "mp_winner_number": "4",
+            "mp_winner_party": "PARTY-0004",
+            "pl_twin_party": "PARTY-0004",
+            "excess_votes": 6,
+        },
+    ]
+    areas = [{"code": "AREA-1001", "win66PartyCode": "PARTY-0037"}, {"code": "AREA-1002"}]
+    settings = {
+        "CANDIDATES_FILE": dump(tmp_path / "candidates.json", {"candidates": CANDIDATES}),
+        "COMMON_DATA_FILE": dump(tmp_path / "common.json", {"areas": areas}),
+        "ANOMALY_FILE": dump(tmp_path / "anomalies.json", {"anomalies": anomalies}),
+        "PL_DIR": tmp_path / "69" / "pl",
+        "ELECTION66_DIR": tmp_path / "66",
+        "OUTPUT_FILE": tmp_path / "cross_election.json",
+    }
+    pl_file(settings["PL_DIR"], "1001", {"PARTY-0037": 30, "PARTY-0009": 70})
+    pl_file(settings["PL_DIR"], "1002", {"PARTY-0004": 50, "PARTY-0009": 50})
+    pl_file(settings["ELECTION66_DIR"] / "pl", "1001", {"PARTY-0029": 50, "PARTY-0022": 50})
+    for name, value in settings.items():
+        monkeypatch.setattr(cross_election, name, value)
+
+    assert cross_election.main()
+    output = json.loads(settings["OUTPUT_FILE"].read_text(encoding="utf-8"))
+
+    first, second = output["areas"]
+    assert first["winner_switched_party"] is True
+    assert first["winner_former_party"] == "PARTY-0037"
+    assert first["seat_held"] is False
+    assert first["twin_pl_swing"] == pytest.approx(-20.0)
+    assert first["winner_party_pl_swing"] == pytest.approx(20.0)
+    assert first["explanation"] == "former_party_loyalty"
+
+    assert second["win66_party"] is None
+    assert second["seat_held"] is None
+    assert second["twin_pl_swing"] is None
+    assert second["explanation"] == "insufficient_66_data"
+
+    assert output["metadata"]["election66_areas"] == 1
+    assert [(s["explanation"], s["count"]) for s in output["summary"]] == [
+        ("former_party_loyalty", 1),
+        ("insufficient_66_data", 1),
+    ]
+
+
+def test_main_fails_without_inputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(cross_election, "ANOMALY_FILE", tmp_path / "missing.json")
+    assert cross_election.main() is False
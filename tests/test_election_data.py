@@ -0,0 +1,105 @@
+import io
+import json
+from functools import partial
+from pathlib import Path
+
+import pytest
+from calculate_nationwide_votes import merge_party_votes, sum_party_votes
+from election_data import (
+    ENTRY_FIELDS,
+    _ChunkedJsonReader,
+    iter_area_entries,
+    load_area_entries,
+    map_shards,
+    shard_by_province,
+)
+
+
+def write_area(directory: Path, area_code: str, entries) -> Path:
+    path = directory / f"{area_code}.json"
+    path.write_text(json.dumps({"area_code": area_code, "entries": entries}), encoding="utf-8")
+    return path
+
+
+def test_shard_by_province_groups_and_orders(tmp_path):
+    paths = [tmp_path / f"{code}.json" for code in ("1102", "1001", "9601", "1101", "1002")]
+    shards = shard_by_province(paths)
+    assert [[p.stem for p in shard] for shard in shards] == [
+        ["1001", "1002"],
+        ["1101", "1102"],
+        ["9601"],
+    ]
+    # Concatenated shards are the sorted file list
+    assert [p for shard in shards for p in shard] == sorted(paths)
+
+
+def test_shard_by_province_empty():
+    assert shard_by_province([]) == []
+
+
+def test_map_shards_pool_matches_serial(tmp_path):
+    paths = []
+    for i, code in enumerate(("1001", "1002", "1101", "2001", "2002", "9601")):
+        entries = [
+            {"partyCode": "PARTY-0001", "voteTotal": 100 + i},
+            {"partyCode": f"PARTY-{i + 2:04d}", "voteTotal": 7 * i},
+        ]
+        paths.append(write_area(tmp_path, code, entries))
+    shards = shard_by_province(paths)
+    func = partial(sum_party_votes, label="PL")
+
+    serial = map_shards(func, shards, workers=1)
+    pooled = map_shards(func, shards, workers=2)
+
+    assert pooled == serial
+    assert len(serial) == 4
+    assert merge_party_votes(serial)["PARTY-0001"] == sum(100 + i for i in range(6))
+
+
+def test_chunked_reader_small_chunks():
+    text = '  {"a": [1, 23.5e1, "x\\u00e9"], "b": {"c": null},\n "n": 123456789}'
+    for chunk_size in (1, 2, 3, 7):
+        reader = _ChunkedJsonReader(io.StringIO(text), chunk_size)
+        reader.expect("{")
+        assert reader.value() == "a"
+        reader.expect(":")
+        assert reader.value() == [1, 235.0, "xé"]
+        assert reader.skip(",")
+        assert reader.value() == "b"
+        reader.expect(":")
+        assert reader.value() == {"c": None}
+        reader.skip(",")
+        assert reader.value() == "n"
+        reader.expect(":")
+        # A number split across chunks must not be cut short
+        assert reader.value() == 123456789
+        reader.expect("}")
+        assert reader.peek() == ""
+
+
+def test_iter_area_entries_matches_full_load(tmp_path):
+    entries = [
+        {
+            "candidateCode": f"CANDIDATE-MP-1001{i:02d}",
+            "partyCode": f"PARTY-{i:04d}",
+            "voteTotal": 1000 * i + 7,
+            "rank": i,
+            "votePercent": 1.5 * i,
+        }
+        for i in range(1, 12)
+    ]
+    path = tmp_path / "1001.json"
+    path.write_text(
+        json.dumps({"area_code": "1001", "entries": entries}, indent=4), encoding="utf-8"
+    )
+
+    expected = [{k: e[k] for k in ENTRY_FIELDS} for e in load_area_entries(path)]
+    for chunk_size in (1, 5, 64, 1 << 16):
+        assert list(iter_area_entries(path, chunk_size=chunk_size)) == expected
+    assert load_area_entries(path, streaming=True) == expected
+
+
+def test_chunked_reader_rejects_unexpected_character():
+    reader = _ChunkedJsonReader(io.StringIO("[1]"), 2)
+    with pytest.raises(ValueError):
+        reader.expect("{")
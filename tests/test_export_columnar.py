@@ -0,0 +1,129 @@
+import json
+import sys
+
+import export_columnar
+import pytest
+from election_data import TIMESTAMP_VERSION
+
+
+def dump(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def fixture(tmp_path, monkeypatch):
+    for area in ("1001", "1002"):
+        mp = [
+            {
+                "candidateCode": f"CANDIDATE-MP-{area}05",
+                "partyCode": "PARTY-0009",
+                "voteTotal": 500,
+                "rank": 1,
+            },
+            {
+                "candidateCode": f"CANDIDATE-MP-{area}01",
+                "partyCode": "PARTY-0001",
+                "voteTotal": 300,
+                "rank": 2,
+            },
+        ]
+        pl = [
+            {"partyCode": "PARTY-0005", "voteTotal": 120, "rank": 1},
+            {"partyCode": "PARTY-0009", "voteTotal": 80, "rank": 2},
+        ]
+        dump(tmp_path / "mp" / f"{area}.json", {"entries": mp})
+        dump(tmp_path / "pl" / f"{area}.json", {"entries": pl})
+    provinces = [{"code": "PROVINCE-10", "regionCode": "bangkok"}]
+    anomalies = [{"area_code": "1001", "pl_twin_party": "PARTY-0005", "excess_votes": 40.5}]
+    comparison = [{"party_code": "PARTY-0005", "party_number": "5", "diff": 12.0}]
+    settings = {
+        "MP_DIR": tmp_path / "mp",
+        "PL_DIR": tmp_path / "pl",
+        "COMMON_DATA_FILE": dump(tmp_path / "common.json", {"provinces": provinces}),
+        "ANOMALY_FILE": dump(tmp_path / "anomalies.json", {"anomalies": anomalies}),
+        "COMPARISON_FILE": dump(tmp_path / "comparison.json", {"comparison_stats": comparison}),
+        "OUTPUT_DIR": tmp_path / "export",
+    }
+    for name, value in settings.items():
+        monkeypatch.setattr(export_columnar, name, value)
+    return tmp_path / "export"
+
+
+def partitions(root):
+    return sorted(p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file())
+
+
+def test_parquet_columns_and_dictionary_encoding(fixture):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    assert export_columnar.main()
+    snapshot = f"snapshot={TIMESTAMP_VERSION}"
+    assert partitions(fixture) == [
+        f"parquet/anomalies/{snapshot}/part-0.parquet",
+        f"parquet/entries/{snapshot}/part-0.parquet",
+        f"parquet/party_comparison/{snapshot}/part-0.parquet",
+    ]
+    entries = pq.read_table(fixture / f"parquet/entries/{snapshot}/part-0.parquet")
+    assert entries.column_names == [
+        "ballot",
+        "area_code",
+        "province_code",
+        "region_code",
+        "party_code",
+        "party_number",
+        "candidate_code",
+        "candidate_number",
+        "votes",
+        "rank",
+    ]
+    assert entries.num_rows == 8
+    for column in ("ballot", "area_code", "province_code", "region_code", "party_code"):
+        assert pa.types.is_dictionary(entries.schema.field(column).type), column
+    assert not pa.types.is_dictionary(entries.schema.field("candidate_code").type)
+    rows = entries.to_pylist()
+    assert rows[0] == {
+        "ballot": "mp",
+        "area_code": "1001",
+        "province_code": "10",
+        "region_code": "bangkok",
+        "party_code": "PARTY-0009",
+        "party_number": 9,
+        "candidate_code": "CANDIDATE-MP-100105",
+        "candidate_number": 5,
+        "votes": 500,
+        "rank": 1,
+    }
+    # PL rows have no candidate
+    assert rows[-1]["candidate_code"] is None and rows[-1]["candidate_number"] is None
+
+    anomalies = pq.read_table(fixture / f"parquet/anomalies/{snapshot}/part-0.parquet")
+    assert anomalies.to_pylist() == [
+        {"area_code": "1001", "pl_twin_party": "PARTY-0005", "excess_votes": 40.5}
+    ]
+    assert pa.types.is_dictionary(anomalies.schema.field("pl_twin_party").type)
+
+
+def test_arrow_format_and_other_snapshots(fixture):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+
+    # Reports describe TIMESTAMP_VERSION only, so another snapshot exports entries alone
+    stale = fixture / "arrow/entries/snapshot=old/stale.arrow"
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"")
+    assert export_columnar.main(snapshot="old", fmt="arrow", streaming=True)
+    assert partitions(fixture) == ["arrow/entries/snapshot=old/part-0.arrow"]
+    table = feather.read_table(fixture / "arrow/entries/snapshot=old/part-0.arrow")
+    assert table.num_rows == 8
+
+
+def test_main_fails_without_inputs_or_pyarrow(fixture, monkeypatch):
+    monkeypatch.setattr(export_columnar, "MP_DIR", fixture / "missing")
+    monkeypatch.setattr(export_columnar, "PL_DIR", fixture / "missing")
+    assert export_columnar.main() is False
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    assert export_columnar.main() is False
+    assert not fixture.exists()
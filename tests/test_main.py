@@ -0,0 +1,122 @@
+import importlib
+import json
+
+import pytest
+
+import main
+
+CONFIGURED_SCRIPTS = (
+    "calculate_nationwide_votes",
+    "generate_anomaly_report",
+    "mp_pl_comparer",
+    "verify_hypothesis",
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_script_settings(monkeypatch):
+    # main.py overrides module constants; put them back so other tests see the defaults
+    for name in CONFIGURED_SCRIPTS:
+        module = importlib.import_module(name)
+        for setting in [k for k in vars(module) if k.isupper()]:
+            monkeypatch.setattr(module, setting, getattr(module, setting))
+
+
+def write_area(directory, area_code, entries):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{area_code}.json").write_text(
+        json.dumps({"area_code": area_code, "entries": entries}), encoding="utf-8"
+    )
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["analyze"],
+        ["nationwide"],
+        ["verify"],
+        ["compare"],
+        ["stream", "--replay"],
+        ["all", "--skip-scrape"],
+    ],
+)
+def test_failed_command_exits_nonzero(tmp_path, command):
+    args = command + ["--raw-dir", str(tmp_path / "missing")]
+    if command[0] in ("analyze", "nationwide", "stream", "all"):
+        args += ["--data-dir", str(tmp_path / "data")]
+    assert main.main(args) == 1
+
+
+@pytest.mark.parametrize(
+    "script, setting",
+    [
+        ("vote_flows", "MP_DIR"),
+        ("spatial_analysis", "ANOMALY_FILE"),
+        ("search_index", "CANDIDATES_FILE"),
+        ("build_map_tiles", "GEOJSON_FILE"),
+    ],
+)
+def test_standalone_scripts_fail_on_missing_input(tmp_path, monkeypatch, script, setting):
+    # Scripts outside main.py follow the same True/False entry-point contract
+    module = importlib.import_module(script)
+    monkeypatch.setattr(module, setting, tmp_path / "missing")
+    assert module.main() is False
+
+
+def test_all_stops_at_first_failure(monkeypatch):
+    calls = []
+
+    def step(name, ok):
+        def run(args):
+            calls.append(name)
+            return ok
+
+        return run
+
+    monkeypatch.setattr(main, "cmd_scrape", step("scrape", True))
+    monkeypatch.setattr(main, "cmd_analyze", step("analyze", False))
+    monkeypatch.setattr(main, "cmd_nationwide", step("nationwide", True))
+    monkeypatch.setattr(main, "cmd_publish", step("publish", True))
+    assert main.main(["all"]) == 1
+    assert calls == ["scrape", "analyze"]
+
+
+def test_all_rejects_data_dir_outside_docs(tmp_path, monkeypatch):
+    calls = []
+    for name in ("scrape", "analyze", "nationwide", "publish"):
+        monkeypatch.setattr(main, f"cmd_{name}", lambda args, name=name: calls.append(name) or True)
+    # Reports written elsewhere would not be packed, so nothing runs
+    assert main.main(["all", "--data-dir", str(tmp_path / "data")]) == 1
+    assert calls == []
+    assert main.main(["all", "--data-dir", "./docs/data/"]) == 0
+    assert calls == ["scrape", "analyze", "nationwide", "publish"]
+
+
+def test_analyze_honors_paths_and_criteria(tmp_path):
+    mp = [
+        {
+            "candidateCode": "CANDIDATE-MP-100102",
+            "partyCode": "PARTY-0001",
+            "voteTotal": 90,
+            "rank": 1,
+        },
+        {
+            "candidateCode": "CANDIDATE-MP-100101",
+            "partyCode": "PARTY-0002",
+            "voteTotal": 10,
+            "rank": 2,
+        },
+    ]
+    pl = [
+        {"partyCode": "PARTY-0001", "voteTotal": 50, "rank": 1},
+        {"partyCode": "PARTY-0002", "voteTotal": 40, "rank": 2},
+    ]
+    write_area(tmp_path / "m", "1001", mp)
+    write_area(tmp_path / "p", "1001", pl)
+    data = tmp_path / "reports"
+    args = ["analyze", "--mp-dir", str(tmp_path / "m"), "--pl-dir", str(tmp_path / "p")]
+    args += ["--data-dir", str(data), "--exclude", "3,4", "--max-number", "9"]
+    assert main.main(args) == 0
+    report = json.loads((data / "anomaly_report.json").read_text(encoding="utf-8"))
+    assert report["metadata"]["criteria"].startswith("Winner MP Number (1-9, excl 3,4) ")
+    assert report["anomalies"][0]["area_code"] == "1001"
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from pack_for_deployment import MANIFEST_FILE, MANIFEST_PLACEHOLDER, build_dist, content_hash
+
+INDEX_HTML = (
+    "<script>const ASSETS = " + MANIFEST_PLACEHOLDER + ";\n"
+    "fetch('data/province_stats.json');\n"
+    "const logo = code => `img/${code}.webp`;</script>\n"
+)
+
+
+@pytest.fixture
+def docs(tmp_path):
+    docs = tmp_path / "docs"
+    files = {
+        "index.html": INDEX_HTML,
+        ".nojekyll": "",
+        "data/province_stats.json": '{"provinces": []}',
+        "data/province_copy.json": '{"provinces": []}',
+        "data/unused.json": "[]",
+        "img/PARTY-0001.webp": "webp bytes",
+        "img/PARTY-0001.png": "png bytes",
+        "img/plain.png": "png only",
+    }
+    for name, content in files.items():
+        path = docs / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return docs
+
+
+def dist_files(dist):
+    return sorted(p.relative_to(dist).as_posix() for p in dist.rglob("*") if p.is_file())
+
+
+def test_hashed_names_dedupe_and_webp(docs, tmp_path):
+    dist = tmp_path / "dist"
+    manifest = build_dist(docs, dist)
+    digest = content_hash(docs / "data/unused.json")
+    assert manifest["data/unused.json"] == f"data/unused.{digest}.json"
+    # Identical files share the copy of the first one in path order
+    assert manifest["data/province_stats.json"] == manifest["data/province_copy.json"]
+    assert manifest["data/province_copy.json"].startswith("data/province_copy.")
+    # PNGs with a .webp twin are not published; others are
+    assert "img/PARTY-0001.png" not in manifest
+    assert "img/plain.png" in manifest
+    assert dist_files(dist) == sorted(
+        set(manifest.values()) | {"index.html", ".nojekyll", MANIFEST_FILE}
+    )
+    assert json.loads((dist / MANIFEST_FILE).read_text(encoding="utf-8")) == manifest
+
+
+def test_index_html_inlines_only_referenced_assets(docs, tmp_path):
+    dist = tmp_path / "dist"
+    manifest = build_dist(docs, dist)
+    html = (dist / "index.html").read_text(encoding="utf-8")
+    assert MANIFEST_PLACEHOLDER not in html
+    inline = json.loads(html.split("const ASSETS = ", 1)[1].split(";\n", 1)[0])
+    # The literal fetch() path and everything under the `img/${...}` template prefix
+    assert inline == {
+        key: manifest[key]
+        for key in ("data/province_stats.json", "img/PARTY-0001.webp", "img/plain.png")
+    }
+
+
+def test_rename_changes_hashed_name(docs, tmp_path):
+    first = build_dist(docs, tmp_path / "dist")
+    (docs / "data/unused.json").rename(docs / "data/renamed.json")
+    second = build_dist(docs, tmp_path / "dist")
+    assert "data/unused.json" not in second
+    assert second["data/renamed.json"] != first["data/unused.json"]
+    assert second["data/renamed.json"].startswith("data/renamed.")
+
+
+def test_second_build_copies_nothing(docs, tmp_path, capsys):
+    dist = tmp_path / "dist"
+    build_dist(docs, dist)
+    mtimes = {p: p.stat().st_mtime_ns for p in dist.rglob("*") if p.is_file()}
+    capsys.readouterr()
+    build_dist(docs, dist)
+    assert "copied 0 bytes" in capsys.readouterr().out
+    assert {p: p.stat().st_mtime_ns for p in dist.rglob("*") if p.is_file()} == mtimes
+
+
+def test_stale_hashed_files_are_removed(docs, tmp_path):
+    dist = tmp_path / "dist"
+    old = build_dist(docs, dist)["data/unused.json"]
+    (docs / "data/unused.json").write_text("[1]", encoding="utf-8")
+    (docs / "img/plain.png").unlink()
+    manifest = build_dist(docs, dist)
+    assert not (dist / old).exists()
+    assert (dist / manifest["data/unused.json"]).exists()
+    assert not any(p.name.startswith("plain.") for p in dist.rglob("*"))
+    assert dist_files(dist) == sorted(
+        set(manifest.values()) | {"index.html", ".nojekyll", MANIFEST_FILE}
+    )
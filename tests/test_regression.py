@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+
+import pytest
+import regression_check
+from regression_check import budget_key, check_budget, compare_output, json_diff
+
+
+def test_json_diff_reports_paths_in_document_order():
+    expected = {"areas": [{"code": "1001", "votes": 10}, {"code": "1002", "votes": 20}], "n": 2}
+    actual = {"areas": [{"code": "1001", "votes": 11}, {"code": "1002", "votes": 20.0}], "n": 2}
+    assert json_diff(expected, actual) == [
+        "$.areas[0].votes: expected 10, got 11",
+        "$.areas[1].votes: expected int 20, got float 20.0",
+    ]
+
+
+def test_json_diff_keys_lengths_and_tolerance():
+    assert json_diff({"a": 1, "b": 2}, {"a": 1, "c": 2}) == [
+        "$: missing keys ['b']",
+        "$: unexpected keys ['c']",
+    ]
+    assert json_diff([1, 2], [1]) == ["$: expected 2 items, got 1"]
+    assert json_diff([0.1 + 0.2], [0.3]) == ["$[0]: expected 0.30000000000000004, got 0.3"]
+    assert json_diff([0.1 + 0.2], [0.3], tolerance=1e-9) == []
+    assert len(json_diff(list(range(50)), [-1] * 50, limit=5)) == 5
+
+
+def test_compare_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(regression_check, "ROOT_DIR", tmp_path)
+    golden, output = tmp_path / "golden.json", tmp_path / "output.json"
+    assert compare_output(golden, output)[0].startswith("no golden file")
+    golden.write_text('{"a": 1, "b": 2}', encoding="utf-8")
+    assert compare_output(golden, output) == ["stage did not write this file"]
+    output.write_text('{"a": 1, "b": 2}', encoding="utf-8")
+    assert compare_output(golden, output) == []
+    output.write_text('{"b": 2, "a": 1}', encoding="utf-8")
+    assert compare_output(golden, output) == [
+        "same data, different serialization (key order or formatting)"
+    ]
+
+
+def test_budget_key():
+    assert budget_key("analyze", 1, False) == "analyze"
+    assert budget_key("analyze", 4, True) == "analyze --workers 4 --stream"
+
+
+def test_check_budget():
+    budget = {"time_units": 2.0, "peak_mb": 30.0}
+    assert check_budget(budget, "analyze", 1.5, 20.0) == []
+    assert len(check_budget(budget, "analyze", 2.5, 40.0)) == 2
+    # Missing entries fail instead of skipping the check
+    assert check_budget({}, "analyze --workers 2", 1.0, None) == [
+        "no budget recorded for 'analyze --workers 2' (run with --update-budgets to add one)"
+    ]
+    assert len(check_budget({"time_units": 2.0}, "analyze", 1.0, 20.0)) == 1
+    assert check_budget({"time_units": 2.0}, "analyze", 1.0, None) == []
+
+
+@pytest.fixture(scope="module")
+def fixture_dir(tmp_path_factory):
+    # REGRESSION_FIXTURE points at an already extracted rawdata/ directory
+    if os.environ.get("REGRESSION_FIXTURE"):
+        return Path(os.environ["REGRESSION_FIXTURE"])
+    pytest.importorskip("rarfile")
+    fixture = regression_check.extract_fixture(
+        regression_check.FIXTURE_ARCHIVE, tmp_path_factory.mktemp("fixture")
+    )
+    if fixture is None:
+        pytest.skip("could not extract rawdata.rar; set REGRESSION_FIXTURE to an extracted copy")
+    return fixture
+
+
+@pytest.mark.parametrize("workers, streaming", [(1, False), (2, True)])
+def test_stages_match_golden_outputs(fixture_dir, workers, streaming):
+    # Time and memory budgets are left to scripts/regression_check.py itself
+    assert regression_check.main(
+        fixture=fixture_dir, repeat=1, workers=workers, streaming=streaming, check_budgets=False
+    )
@@ -0,0 +1,86 @@
+import pytest
+from search_index import (
+    PREFIX_MARK,
+    SearchIndex,
+    build_index,
+    normalize_text,
+    shard_key,
+    split_clusters,
+    text_grams,
+)
+
+DOCS = [
+    ["candidate", "CANDIDATE-MP-100118", "กิตติคุณ ชื่นแย้ม", "AREA-1001 PARTY-0001"],
+    ["candidate", "CANDIDATE-MP-100201", "ชื่อเสียง กล้าหาญ", "AREA-1002 PARTY-0002"],
+    ["candidate", "CANDIDATE-MP-100305", "สมชาย เชื่อมั่น", "AREA-1003 PARTY-0001"],
+    ["party", "PARTY-0001", "เพื่อไทย", "Pheu Thai"],
+    ["province", "PROVINCE-50", "เชียงใหม่", ""],
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    build_index(DOCS, tmp_path / "search")
+    return SearchIndex(tmp_path / "search")
+
+
+def codes(results):
+    return [r["code"] for r in results]
+
+
+def test_normalize_text():
+    # Zero-width characters go, SARA AM is one character, whitespace collapses
+    assert normalize_text("  ก​า  นํา ") == "กา นำ"
+    assert normalize_text("Pheu  THAI") == "pheu thai"
+    assert normalize_text(None) == ""
+
+
+def test_split_clusters_keeps_marks_on_their_consonant():
+    assert split_clusters("ชื่อ") == ["ชื่", "อ"]
+    assert split_clusters("กิตติคุณ") == ["กิ", "ต", "ติ", "คุ", "ณ"]
+    assert split_clusters("abc") == ["a", "b", "c"]
+
+
+def test_text_grams_use_base_characters():
+    assert text_grams("ชื่อ") == {PREFIX_MARK + "ช", "ชื่อ"}
+    assert text_grams("เชื่อม") == {PREFIX_MARK + "เ", "เช", "ชื่อ", "อม"}
+
+
+def test_shard_key():
+    assert shard_key(PREFIX_MARK + "ก") == "0e01"
+    assert shard_key("กิต") == "0e01"
+    assert shard_key(PREFIX_MARK + PREFIX_MARK) == "005e"
+    with pytest.raises(ValueError):
+        shard_key(PREFIX_MARK)
+
+
+def test_search_single_character_matches_word_starts(index):
+    # 'กิตติคุณ' starts with the cluster 'กิ' but still matches a bare 'ก'
+    assert codes(index.search("ก")) == ["CANDIDATE-MP-100118", "CANDIDATE-MP-100201"]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("ชื", ["CANDIDATE-MP-100118", "CANDIDATE-MP-100201"]),
+        ("ชื่", ["CANDIDATE-MP-100118", "CANDIDATE-MP-100201"]),
+        # Multi-cluster tokens match anywhere in a word
+        ("ชื่อ", ["CANDIDATE-MP-100201", "CANDIDATE-MP-100305"]),
+        ("เชื", ["CANDIDATE-MP-100305"]),
+        ("เชีย", ["PROVINCE-50"]),
+        ("ติคุ", ["CANDIDATE-MP-100118"]),
+    ],
+)
+def test_search_partly_typed_clusters(index, query, expected):
+    assert codes(index.search(query)) == expected
+
+
+def test_search_tokens_kind_and_limit(index):
+    assert codes(index.search("สมชาย เชื่อ")) == ["CANDIDATE-MP-100305"]
+    assert codes(index.search("สมชาย เพื่อ")) == []
+    # Party English names are searchable, candidate codes are not
+    assert codes(index.search("thai")) == ["PARTY-0001"]
+    assert codes(index.search("area")) == []
+    assert codes(index.search("ก", kind="party")) == []
+    assert len(index.search("ก", limit=1)) == 1
+    assert index.search("   ") == []
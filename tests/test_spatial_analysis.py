@@ -0,0 +1,93 @@
+import json
+import random
+
+import pytest
+from spatial_analysis import (
+    center,
+    local_morans,
+    morans_i,
+    spatial_lag,
+    to_csr,
+    twin_differences,
+)
+
+
+def rook_lattice(size: int):
+    # size x size grid, cells "r,c" ordered row by row, neighbors share an edge
+    ids = [f"{r},{c}" for r in range(size) for c in range(size)]
+    neighbors = {
+        f"{r},{c}": [
+            f"{r + dr},{c + dc}"
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+            if 0 <= r + dr < size and 0 <= c + dc < size
+        ]
+        for r in range(size)
+        for c in range(size)
+    }
+    return to_csr(neighbors, ids)
+
+
+def test_to_csr_and_spatial_lag():
+    csr = rook_lattice(2)
+    assert csr["indptr"] == [0, 2, 4, 6, 8]
+    # "0,0" borders "0,1" and "1,0"
+    assert csr["indices"][0:2] == [1, 2]
+    assert spatial_lag(csr, [1.0, 2.0, 3.0, 4.0]) == [2.5, 2.5, 2.5, 2.5]
+
+
+def test_center():
+    assert center([1.0, 2.0, 3.0]) == [-1.0, 0.0, 1.0]
+    assert center([5.0, 5.0]) is None
+
+
+def test_morans_i_checkerboard_is_perfectly_negative():
+    csr = rook_lattice(4)
+    values = [float((i // 4 + i % 4) % 2) for i in range(16)]
+    result = morans_i(csr, values, 99, random.Random(0))
+    assert result["I"] == pytest.approx(-1.0)
+    assert result["expected_I"] == pytest.approx(-1 / 15, abs=1e-4)
+    assert result["z_sim"] < 0
+    assert result["p_sim"] == pytest.approx(0.01)
+
+
+def test_morans_i_clustered_halves_is_positive():
+    csr = rook_lattice(4)
+    values = [float(i % 4 < 2) for i in range(16)]
+    result = morans_i(csr, values, 99, random.Random(0))
+    assert result["I"] > 0.5
+    assert result["p_sim"] <= 0.05
+
+
+def test_morans_i_constant_variable():
+    assert morans_i(rook_lattice(3), [2.0] * 9, 99, random.Random(0)) is None
+
+
+def test_local_morans_average_to_global():
+    # With row-standardized weights and no islands, global I is the mean of the local I_i
+    csr = rook_lattice(4)
+    values = [float(v) for v in (3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8, 9, 7, 9, 3)]
+    global_i = morans_i(csr, values, 0, random.Random(0))["I"]
+    local = local_morans(csr, values, 99, random.Random(0))
+    assert sum(r["lisa"] for r in local) / len(local) == pytest.approx(global_i, abs=1e-3)
+    assert all(0 < r["p_sim"] <= 1 for r in local)
+    assert {r["quadrant"] for r in local} <= {"HH", "LL", "HL", "LH", "ns"}
+
+
+def test_twin_differences_cover_every_twin_area(tmp_path):
+    def write_area(kind, area, entries):
+        (tmp_path / kind).mkdir(exist_ok=True)
+        path = tmp_path / kind / f"{area}.json"
+        path.write_text(json.dumps({"entries": entries}), encoding="utf-8")
+
+    # (winner ballot number, PARTY-0005 PL votes) per area
+    areas = {"1001": (5, 300), "1002": (5, 40), "1003": (1, 100), "1004": (2, 60)}
+    for area, (number, votes) in areas.items():
+        write_area("mp", area, [{"candidateCode": f"CANDIDATE-MP-{area}{number:02d}"}])
+        write_area("pl", area, [{"partyCode": "PARTY-0005", "voteTotal": votes}])
+    write_area("mp", "1005", [{"candidateCode": "CANDIDATE-MP-100505"}])  # No PL file
+
+    result = twin_differences(["PARTY-0005", "PARTY-0001"], tmp_path / "mp", tmp_path / "pl")
+    # Non-twin mean for #5 is (100 + 60) / 2; the weak twin area 1002 keeps its negative value
+    assert result["PARTY-0005"] == {"1001": 220.0, "1002": -40.0}
+    # PARTY-0001 has no PL entry anywhere, so its one twin area counts 0 votes
+    assert result["PARTY-0001"] == {"1003": 0.0}
@@ -0,0 +1,95 @@
+import json
+import threading
+
+import calculate_nationwide_votes as nationwide
+import election_scraper as scraper
+import generate_anomaly_report as report
+import pytest
+import stream_pipeline
+
+MP = [
+    {"candidateCode": "CANDIDATE-MP-100102", "partyCode": "PARTY-0001", "voteTotal": 90, "rank": 1},
+    {"candidateCode": "CANDIDATE-MP-100101", "partyCode": "PARTY-0002", "voteTotal": 10, "rank": 2},
+]
+PL = [
+    {"partyCode": "PARTY-0001", "voteTotal": 50, "rank": 1},
+    {"partyCode": "PARTY-0002", "voteTotal": 40, "rank": 2},
+]
+AREAS = [str(code) for code in range(1001, 1011)]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    settings = {
+        report: {
+            "COMMON_DATA_FILE": data / "common-data.json",
+            "OUTPUT_ANOMALY_FILE": data / "anomaly_report.json",
+            "OUTPUT_PROVINCE_FILE": data / "province_stats.json",
+            "OUTPUT_MP_PARTY_FILE": data / "mp_party_stats.json",
+            "OUTPUT_COMPARISON_FILE": data / "party_comparison_stats.json",
+        },
+        nationwide: {"OUTPUT_FILE": data / "nationwide_party_stats.json"},
+        scraper: {"MP_DIR": tmp_path / "raw" / "mp", "PL_DIR": tmp_path / "raw" / "pl"},
+    }
+    for module, constants in settings.items():
+        for name, value in constants.items():
+            monkeypatch.setattr(module, name, value)
+    monkeypatch.setattr(
+        stream_pipeline, "scrape_source", lambda failed: ((code, MP, PL) for code in AREAS)
+    )
+    return data
+
+
+def run(queue_size):
+    # A hung pipeline fails the test instead of blocking the run
+    result = []
+    thread = threading.Thread(
+        target=lambda: result.append(stream_pipeline.main(queue_size=queue_size)), daemon=True
+    )
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "pipeline hung"
+    return result[0]
+
+
+def test_live_run_saves_areas_and_writes_final_reports(data_dir, tmp_path):
+    assert run(queue_size=2)
+    assert sorted(p.stem for p in (tmp_path / "raw" / "mp").iterdir()) == AREAS
+    assert sorted(p.stem for p in (tmp_path / "raw" / "pl").iterdir()) == AREAS
+    stats = json.loads((data_dir / "nationwide_party_stats.json").read_text(encoding="utf-8"))
+    assert "progress" not in stats
+
+
+def raise_error(data_type, area_code, entries):
+    raise OSError("disk full")
+
+
+def kill_writer(data_type, area_code, entries):
+    raise SystemExit
+
+
+@pytest.mark.parametrize(
+    "save",
+    [
+        "under_file",
+        lambda *args: False,
+        raise_error,
+        pytest.param(
+            kill_writer,
+            marks=pytest.mark.filterwarnings(
+                "ignore::pytest.PytestUnhandledThreadExceptionWarning"
+            ),
+        ),
+    ],
+)
+def test_failed_saves_leave_reports_partial(data_dir, tmp_path, monkeypatch, capsys, save):
+    if save == "under_file":
+        # mkdir fails when the raw directory sits under a regular file
+        (tmp_path / "raw").write_text("", encoding="utf-8")
+    else:
+        monkeypatch.setattr(scraper, "save_to_json", save)
+    assert run(queue_size=1) is False
+    assert "Error: Failed to save areas: 1001" in capsys.readouterr().out
+    stats = json.loads((data_dir / "nationwide_party_stats.json").read_text(encoding="utf-8"))
+    assert stats["progress"]["areas_processed"] == len(AREAS)
@@ -0,0 +1,99 @@
+import pytest
+from vote_flows import SIZE, fit_area_shard, fit_areas, fit_national, number_index, project_simplex
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize(
+    "v",
+    [
+        [0.2, 0.3, 0.5],
+        [1.0, 1.0, 1.0],
+        [-1.0, 0.5, 2.0],
+        [0.0, 0.0, 0.0],
+        [5.0],
+        [0.9, -0.3, 0.4, 0.1],
+    ],
+)
+def test_project_simplex_lands_on_simplex(v):
+    x = project_simplex(np.array(v))
+    assert x.shape == (len(v),)
+    assert (x >= 0).all()
+    assert x.sum() == pytest.approx(1.0)
+
+
+def test_project_simplex_known_values():
+    # Points already on the simplex are fixed; otherwise the excess is shifted off evenly
+    assert project_simplex(np.array([0.2, 0.3, 0.5])) == pytest.approx([0.2, 0.3, 0.5])
+    assert project_simplex(np.array([1.0, 1.0, 1.0])) == pytest.approx([1 / 3, 1 / 3, 1 / 3])
+    assert project_simplex(np.array([2.0, 0.0])) == pytest.approx([1.0, 0.0])
+    assert project_simplex(np.array([0.8, 0.6, -1.0])) == pytest.approx([0.6, 0.4, 0.0])
+
+
+def test_project_simplex_is_closest_point():
+    v = np.array([0.7, -0.2, 0.9, 0.1])
+    x = project_simplex(v)
+    distance = ((v - x) ** 2).sum()
+    # Any other simplex point is at least as far away
+    for other in ([0.25] * 4, [0.4, 0.0, 0.6, 0.0], [0.5, 0.0, 0.5, 0.0], [0.0, 0.0, 1.0, 0.0]):
+        assert ((v - np.array(other)) ** 2).sum() >= distance - 1e-12
+
+
+def test_project_simplex_batches_rows():
+    rng = np.random.default_rng(0)
+    v = rng.normal(size=(3, 5, SIZE))
+    batched = project_simplex(v)
+    assert batched.shape == v.shape
+    for index in np.ndindex(3, 5):
+        assert batched[index] == pytest.approx(project_simplex(v[index]))
+
+
+def shares(*numbers):
+    row = [0.0] * SIZE
+    for number, share in numbers:
+        row[number_index(number)] = share
+    return row
+
+
+def test_fit_national_recovers_transfer_matrix():
+    # Areas generated from a known row-stochastic matrix are fitted back to it
+    rng = np.random.default_rng(1)
+    truth = project_simplex(rng.random((SIZE, SIZE)) * 3)
+    M = rng.dirichlet(np.ones(SIZE), size=200)
+    T, iterations = fit_national(M, M @ truth)
+    assert np.allclose(T.sum(axis=1), 1.0)
+    assert np.abs(T - truth).max() < 1e-3
+    assert iterations > 1
+
+
+def test_fit_area_shard_rows_stay_stochastic():
+    national = [[1 / SIZE] * SIZE for _ in range(SIZE)]
+    m = shares((3, 0.6), (7, 0.4))
+    p = shares((3, 0.7), (9, 0.3))
+    area = {"area_code": "1001", "winner_number": 3, "m": m, "p": p}
+    (result,) = fit_area_shard([area], national, ridge=0.05)
+    assert result["area_code"] == "1001"
+    # Only ballot numbers fielded in the area get a twin share
+    assert set(result["twin_share"]) == {"3", "7"}
+    assert sum(result["winner_flows"].values()) == pytest.approx(1.0, abs=1e-3)
+    # The fit moves #3's voters toward party #3
+    assert result["twin_share"]["3"] > 1 / SIZE
+    assert fit_area_shard([], national) == []
+
+
+def test_fit_areas_batch_matches_single_fits():
+    rng = np.random.default_rng(2)
+    national = project_simplex(rng.random((SIZE, SIZE)))
+    areas = [
+        {"m": shares((1, 0.5), (2, 0.5)), "p": shares((1, 0.9), (4, 0.1))},
+        {"m": shares((5, 1.0)), "p": shares((5, 0.4), (2, 0.6))},
+        {"m": shares((1, 0.2), (16, 0.8)), "p": shares((16, 1.0))},
+    ]
+    batched = fit_areas(areas, national)
+    assert batched.shape == (3, SIZE, SIZE)
+    for area, T in zip(areas, batched):
+        assert T == pytest.approx(fit_areas([area], national)[0])
+        # Unfielded ballot numbers keep the national row
+        unfielded = np.array(area["m"]) == 0
+        assert np.array_equal(T[unfielded], national[unfielded])
+        assert np.allclose(T.sum(axis=1), 1.0)